@@ -0,0 +1,91 @@
+"""
+Compare the recursive walk which PyLintASTWalker used to do against its
+compiled, iterative one, over the modules of pylint's functional tests.
+
+    PYTHONPATH=pylib python benchmarks/bench_ast_walker.py [module.py ...]
+
+"""
+
+import glob
+import sys
+import time
+
+from logilab.astng import MANAGER
+from pylint.lint import PyLinter
+from pylint.utils import PyLintASTWalker
+
+
+class RecursiveWalker(PyLintASTWalker):
+
+    def walk(self, astng):
+        cid = astng.__class__.__name__.lower()
+        if astng.is_statement:
+            self.nbstatements += 1
+        for cb in self.visit_events.get(cid, ()):
+            cb(astng)
+        for child in astng.get_children():
+            self.walk(child)
+        for cb in self.leave_events.get(cid, ()):
+            cb(astng)
+
+
+class NamesChecker(object):
+    """a checker which only looks at names"""
+
+    def __init__(self):
+        self.names = 0
+
+    def visit_name(self, node):
+        self.names += 1
+
+
+class StatementsChecker(object):
+    """a checker which only looks at some statements"""
+
+    def __init__(self):
+        self.statements = 0
+
+    def visit_function(self, node):
+        self.statements += 1
+
+    def leave_class(self, node):
+        self.statements += 1
+
+
+def load_modules(paths):
+    modules = []
+    for path in paths:
+        try:
+            modules.append(MANAGER.astng_from_file(path))
+        except Exception:
+            pass # syntax errors...
+    return modules
+
+
+def best_time(walker_class, checker_class, modules):
+    best = None
+    for _ in range(5):
+        walker = walker_class(PyLinter())
+        walker.add_checker(checker_class())
+        start = time.time()
+        for module in modules:
+            walker.walk(module)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, walker.nbstatements
+
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob('pylib/pylint/test/input/*.py'))
+    modules = load_modules(paths)
+    sys.stdout.write('%s modules\n' % len(modules))
+    for checker_class in (NamesChecker, StatementsChecker):
+        for walker_class in (RecursiveWalker, PyLintASTWalker):
+            elapsed, statements = best_time(walker_class, checker_class, modules)
+            sys.stdout.write('%-18s %-16s %8.1f ms (%s statements)\n' % (
+                checker_class.__name__, walker_class.__name__, elapsed * 1000,
+                statements))
+
+
+if __name__ == '__main__':
+    main()
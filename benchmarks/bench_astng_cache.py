@@ -0,0 +1,58 @@
+"""
+Compare building the astng trees of some modules from their source against
+loading them from the on disk cache that a previous run left behind. Each
+timing is the best of several runs; cold runs start from an empty cache.
+
+    PYTHONPATH=pylib python benchmarks/bench_astng_cache.py [module.py ...]
+
+"""
+
+import glob
+import shutil
+import sys
+import tempfile
+import time
+
+from logilab.astng import MANAGER
+from logilab.astng.builder import ASTNGBuilder
+
+
+RUNS = 5
+
+
+def build_all(paths, cache_dir):
+    MANAGER.cache_dir = cache_dir
+    builder = ASTNGBuilder(MANAGER)
+    start = time.time()
+    for path in paths:
+        MANAGER.astng_cache.clear()
+        builder.file_build(path)
+    return time.time() - start
+
+
+def best_of(paths, cache_dir, cold):
+    timings = []
+    for run in range(RUNS):
+        if cold:
+            shutil.rmtree(cache_dir)
+        timings.append(build_all(paths, cache_dir))
+    return min(timings)
+
+
+def main():
+    paths = sys.argv[1:] or glob.glob('pylib/pylint/checkers/*.py') + glob.glob('pylib/logilab/astng/*.py')
+    cache_dir = tempfile.mkdtemp()
+    try:
+        sys.stdout.write('%s modules, best of %s\n' % (len(paths), RUNS))
+        for label, directory, cold in (
+                ('no cache', None, False),
+                ('cold cache', cache_dir, True),
+                ('warm cache', cache_dir, False)):
+            sys.stdout.write('%-10s %8.1f ms\n' % (label, best_of(paths, directory, cold) * 1000))
+    finally:
+        MANAGER.cache_dir = None
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
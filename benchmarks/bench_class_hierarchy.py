@@ -0,0 +1,60 @@
+"""
+Compare looking up the ancestors and attributes of the classes of a 20 level
+hierarchy with the ancestors cache of astng Class nodes, against dropping the
+cache before each lookup as if there was none.
+
+    PYTHONPATH=pylib python benchmarks/bench_class_hierarchy.py [depth]
+
+"""
+
+import sys
+import time
+
+from logilab.astng import MANAGER
+from logilab.astng.builder import ASTNGBuilder
+
+
+def hierarchy_code(depth):
+    lines = ['class Level0(object):',
+             '    root_attr = 0']
+    for level in range(1, depth):
+        lines += ['class Mixin%s(object):' % level,
+                  '    def mixin_method%s(self):' % level,
+                  '        pass',
+                  'class Level%s(Level%s, Mixin%s):' % (level, level - 1, level),
+                  '    attr%s = %s' % (level, level),
+                  '    def method%s(self):' % level,
+                  '        self.instance_attr%s = %s' % (level, level)]
+    return '\n'.join(lines) + '\n'
+
+
+def lookups(classes, clear):
+    for klass in classes:
+        for operation in (lambda: list(klass.ancestors()),
+                          lambda: klass.getattr('root_attr'),
+                          lambda: list(klass.local_attr_ancestors('attr1')),
+                          lambda: list(klass.methods()),
+                          lambda: klass.has_dynamic_getattr()):
+            if clear:
+                MANAGER.clear_infer_cache()
+            operation()
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    module = ASTNGBuilder(MANAGER).string_build(hierarchy_code(depth), 'hierarchy')
+    classes = [module['Level%s' % level] for level in range(depth)]
+    sys.stdout.write('%s levels\n' % depth)
+    for label, clear in (('no cache', True), ('cache', False)):
+        best = None
+        for _ in range(5):
+            MANAGER.clear_infer_cache()
+            start = time.time()
+            lookups(classes, clear)
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        sys.stdout.write('%-10s %8.1f ms\n' % (label, best * 1000))
+
+
+if __name__ == '__main__':
+    main()
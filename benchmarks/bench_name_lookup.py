@@ -0,0 +1,55 @@
+"""
+Compare looking up the names of a module assigning the same few names
+thousands of times, with the lookup results and statements tables cached by
+astng, against dropping the cache before each lookup as if there was none.
+
+    PYTHONPATH=pylib python benchmarks/bench_name_lookup.py [assignments]
+
+"""
+
+import sys
+import time
+
+from logilab.astng import MANAGER, nodes
+from logilab.astng.builder import ASTNGBuilder
+
+NAMES = ('a', 'b', 'c')
+
+
+def module_code(assignments):
+    lines = []
+    for index in range(assignments):
+        name = NAMES[index % len(NAMES)]
+        lines.append('%s = %s' % (name, index))
+        if index % 10 == 0:
+            lines.append('print %s' % name)
+    return '\n'.join(lines) + '\n'
+
+
+def lookups(names, clear):
+    for node in names:
+        if clear:
+            MANAGER.clear_infer_cache()
+        node.lookup(node.name)
+
+
+def main():
+    assignments = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    module = ASTNGBuilder(MANAGER).string_build(module_code(assignments), 'lookups')
+    names = list(module.nodes_of_class(nodes.Name))
+    sys.stdout.write('%s assignments, %s names looked up twice\n' % (
+        assignments, len(names)))
+    for label, clear in (('no cache', True), ('cache', False)):
+        best = None
+        for _ in range(3):
+            MANAGER.clear_infer_cache()
+            start = time.time()
+            lookups(names, clear)
+            lookups(names, clear)
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        sys.stdout.write('%-10s %8.1f ms\n' % (label, best * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Compare asking every node of the pylint functional test modules for its
+enclosing statement, frame, scope and root once the answers are recorded by
+astng, against their first use, which climbs the tree to record them.
+
+    PYTHONPATH=pylib python benchmarks/bench_parent_chain.py [module.py ...]
+
+"""
+
+import glob
+import os
+import sys
+import time
+
+from logilab.astng import MANAGER
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                      'pylib', 'pylint', 'test', 'input', '*.py')
+
+
+def load_nodes(paths):
+    all_nodes = []
+    for path in paths:
+        try:
+            stack = [MANAGER.astng_from_file(path)]
+        except Exception:
+            continue # syntax errors...
+        while stack:
+            node = stack.pop()
+            all_nodes.append(node)
+            stack.extend(node.get_children())
+    return all_nodes
+
+
+def ask(all_nodes):
+    for node in all_nodes:
+        node.statement()
+        node.frame()
+        node.scope()
+        node.root()
+
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob(CORPUS))
+    start = time.time()
+    all_nodes = load_nodes(paths)
+    sys.stdout.write('%s nodes built in %.1f s\n' % (
+        len(all_nodes), time.time() - start))
+    for label, forget in (('first use', True), ('recorded', False)):
+        best = None
+        for _ in range(5):
+            if forget:
+                for node in all_nodes:
+                    if node.parent is not None: # modules record their own
+                        node._chain = None
+            start = time.time()
+            ask(all_nodes)
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        sys.stdout.write('%-10s %8.1f ms\n' % (label, best * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Compare the cost of checking a buffer with pep8 when a new StyleGuide is
+built for every request against reusing a cached one.
+
+    PYTHONPATH=pylib python benchmarks/bench_pep8_setup.py
+
+"""
+
+import sys
+import timeit
+
+import pep8
+
+from pplinter.reporters import Pep8Report
+from pplinter.session import LintSession
+from pplinter.styleguides import check_session
+
+
+LINES = ['import os\n', 'x=1\n', '\n', 'def f(a):\n', '  return a\n']
+REPEAT = 500
+
+
+def fresh_style_guide():
+    style_guide = pep8.StyleGuide(parse_argv=False, config_file=True, reporter=Pep8Report)
+    style_guide.input_file('bench.py', lines=LINES)
+    return style_guide.options.report.problems
+
+
+def setup_only():
+    pep8.StyleGuide(parse_argv=False, config_file=True, reporter=Pep8Report)
+
+
+def cached_style_guide():
+    return check_session(LintSession('bench.py', LINES))
+
+
+def main():
+    assert fresh_style_guide() == cached_style_guide()
+    for name, function in (
+        ('setup only', setup_only),
+        ('fresh style guide', fresh_style_guide),
+        ('cached style guide', cached_style_guide),
+    ):
+        best = min(timeit.repeat(function, number=REPEAT, repeat=3))
+        sys.stdout.write('%-20s %8.1f us per request\n' % (name, best / REPEAT * 1e6))
+
+
+if __name__ == '__main__':
+    main()
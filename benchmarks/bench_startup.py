@@ -0,0 +1,39 @@
+"""
+Compare the time python takes to import pylint.lint, now that the builtins
+module is only built on first use, against importing it and building the
+builtins right away as the import used to do.
+
+    PYTHONPATH=pylib python benchmarks/bench_startup.py
+
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+STATEMENTS = (
+    ('python -c pass', 'pass'),
+    ('import (lazy)', 'import pylint.lint'),
+    ('import + builtins', 'import pylint.lint; '
+                          'from logilab.astng import nodes; nodes.List._proxied'),
+    )
+
+
+def best_time(statement):
+    best = None
+    for _ in range(10):
+        start = time.time()
+        subprocess.check_call([sys.executable, '-c', statement], env=os.environ)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    for label, statement in STATEMENTS:
+        sys.stdout.write('%-18s %8.1f ms\n' % (label, best_time(statement) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Compare the raw checkers of pylint tokenizing each module themselves against
+sharing the tokens of one tokenization, as the linter does.
+
+    PYTHONPATH=pylib python benchmarks/bench_token_checkers.py [module.py ...]
+
+"""
+
+import glob
+import sys
+import time
+
+from logilab.astng import MANAGER
+from logilab.common.interface import implements
+from pylint import checkers
+from pylint.checkers import tokenize_module
+from pylint.interfaces import ITokenChecker
+from pylint.lint import PyLinter
+from pylint.reporters import CollectingReporter
+
+
+def make_linter():
+    linter = PyLinter(reporter=CollectingReporter())
+    checkers.initialize(linter)
+    linter.set_option('persistent', False)
+    neededcheckers = linter.prepare_checkers()
+    for checker in neededcheckers:
+        checker.open()
+    tokencheckers = [checker for checker in neededcheckers
+                     if implements(checker, ITokenChecker)]
+    return linter, tokencheckers
+
+
+def separate(linter, tokencheckers, modules):
+    for module in modules:
+        linter.set_current_module(module.name, module.file)
+        linter.process_module(module)
+        for checker in tokencheckers:
+            checker.process_module(module)
+
+
+def shared(linter, tokencheckers, modules):
+    for module in modules:
+        linter.set_current_module(module.name, module.file)
+        tokens = tokenize_module(module)
+        linter.process_tokens(tokens)
+        for checker in tokencheckers:
+            checker.process_tokens(tokens)
+
+
+def main():
+    paths = sys.argv[1:] or glob.glob('pylib/pylint/checkers/*.py') + glob.glob('pylib/logilab/astng/*.py')
+    modules = [MANAGER.astng_from_file(path) for path in paths]
+    linter, tokencheckers = make_linter()
+    sys.stdout.write('%s modules, checkers: %s\n' % (
+        len(modules), ', '.join(checker.name for checker in tokencheckers)))
+    for function in (separate, shared):
+        best = None
+        for _ in range(3):
+            start = time.time()
+            function(linter, tokencheckers, modules)
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        sys.stdout.write('%-10s %8.1f ms\n' % (function.__name__, best * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Measure the memory taken by the astng trees of the standard library modules:
+the size of their nodes, including the instance dictionary of the nodes which
+have one, and how much the resident size of the process grows while they are
+built.
+
+    PYTHONPATH=pylib python benchmarks/bench_tree_memory.py [module.py ...]
+
+"""
+
+import gc
+import glob
+import os
+import resource
+import sys
+import time
+
+from logilab.astng import MANAGER
+
+
+def load_modules(paths):
+    modules = []
+    for path in paths:
+        try:
+            modules.append(MANAGER.astng_from_file(path))
+        except Exception:
+            pass # syntax errors...
+    return modules
+
+
+def node_size(node):
+    # instance dictionaries are referents of the nodes which have one, get
+    # them that way since node.__dict__ would create missing ones
+    size = sys.getsizeof(node)
+    for referent in gc.get_referents(node):
+        if referent.__class__ is dict:
+            size += sys.getsizeof(referent)
+    return size
+
+
+def trees_size(modules):
+    nodes = size = 0
+    stack = list(modules)
+    while stack:
+        node = stack.pop()
+        nodes += 1
+        size += node_size(node)
+        stack.extend(node.get_children())
+    return nodes, size
+
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob(
+        os.path.join(os.path.dirname(os.__file__), '*.py')))
+    gc.collect()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.time()
+    modules = load_modules(paths)
+    elapsed = time.time() - start
+    gc.collect()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss
+    nodes, size = trees_size(modules)
+    sys.stdout.write('%s modules, %s nodes built in %.1f s\n' % (
+        len(modules), nodes, elapsed))
+    sys.stdout.write('nodes size %8.1f MB (%s bytes per node)\n' % (
+        size / 1024. / 1024, size // nodes))
+    sys.stdout.write('rss growth %8.1f MB\n' % (rss / 1024.))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,10 +2,15 @@ import logging
 import os
 import re
 import sys
-import tempfile
+import threading
 
 from koLintResults import koLintResults
+from pplinter.cache import RESULTS
 from pplinter.checkers import Pep8Checker, PyflakesChecker, PylintChecker
+from pplinter.preferences import PrefSet
+from pplinter.runner import Cancellation, run_checkers, run_checkers_later
+from pplinter.session import LintSession
+from pplinter.stats import STATS
 from xpcom import components
 
 
@@ -25,16 +30,24 @@ class PerfectPythonLinter(object):
 
     checker_classes = (Pep8Checker, PyflakesChecker, PylintChecker)
 
+    default_deadline = 10
+
     def __init__(self):
         self._python = (
             components
             .classes['@activestate.com/koAppInfoEx?app=Python;1']
             .createInstance(components.interfaces.koIAppInfoEx)
         )
+        self._requests = {}
+        self._requests_lock = threading.Lock()
 
     def lint(self, request):
         text = request.content.encode(request.encoding.python_encoding_name)
-        return self.lint_with_text(request, text)
+        with STATS.timer('Linter', 'request'):
+            results = self.lint_with_text(request, text)
+        if PrefSet(request, 'linter').get_boolean('debugTimings'):
+            LOG.warn('Lint timings:\n%s' % STATS.summary())
+        return results
 
     def lint_with_text(self, request, text):
 
@@ -55,30 +68,122 @@ class PerfectPythonLinter(object):
 
         text_lines = text.splitlines(True)
 
-        results = koLintResults()
+        # The checkers work on the text in memory, but the path is still used
+        # for messages and for pylint to find the module's package.
+        path = self.get_path(request)
 
-        temp_file = tempfile.NamedTemporaryFile(
-            mode='w',
-            suffix='.py',
-            delete=False,
-        )
+        # The checkers share one copy of the text, its tokens and its tree.
+        session = LintSession(path, text_lines)
 
-        try:
+        # Every request makes the previous one for this document stale, so
+        # stop any of its checkers that are still running. Documents are
+        # told apart by identity, since unsaved ones share a path.
+        document = request.koDoc
+        cancellation = self.start_request(document)
+        finished_later = False
 
-            temp_file.write(text)
-            temp_file.close()
+        try:
 
+            checkers = []
             for checker_class in self.checker_classes:
-
                 try:
+                    checker = checker_class(request, session, python=python, cancellation=cancellation)
+                    with STATS.timer(checker.label, 'preferences'):
+                        enabled = checker.prepare()
+                    if enabled:
+                        checkers.append(checker)
+                except Exception:
+                    LOG.exception('Error preparing %s' % checker_class.__name__)
 
-                    checker = checker_class(request, temp_file.name, text_lines, python=python)
-                    checker.add_to_results(results)
+            preferences = PrefSet(request, 'linter')
+            deadline = preferences.get_float('deadline', default=self.default_deadline)
 
-                except Exception:
-                    LOG.exception('Error running %s' % checker_class.__name__)
+            # Slow checkers that have to do real work are run after returning
+            # the others' results, and publish all of the results again when
+            # they finish.
+            delayed = []
+            if preferences.get_boolean('streaming') and hasattr(request, 'lintBuffer'):
+                delayed = [
+                    checker for checker in checkers
+                    if checker.slow and not RESULTS.is_fresh(checker.cache_key)
+                ]
+                checkers = [checker for checker in checkers if checker not in delayed]
+
+            results = run_checkers(checkers, deadline)
+
+            if delayed:
+
+                def publish(delayed_results):
+                    try:
+                        if cancellation.cancelled:
+                            LOG.debug('Dropped stale results for %s' % path)
+                        else:
+                            self.publish_results(request, results + delayed_results)
+                    finally:
+                        self.finish_request(document, cancellation)
+
+                run_checkers_later(delayed, deadline, publish)
+                finished_later = True
+
+            return self.make_results(results)
 
         finally:
-            os.unlink(temp_file.name)
+            if not finished_later:
+                self.finish_request(document, cancellation)
+
+    @staticmethod
+    def make_results(results):
+        lint_results = koLintResults()
+        for result in results:
+            lint_results.addResult(result)
+        return lint_results
+
+    def start_request(self, document):
+        """Cancel the document's previous request and track a new one."""
+        cancellation = Cancellation()
+        with self._requests_lock:
+            previous = self._requests.get(document)
+            self._requests[document] = cancellation
+        if previous is not None:
+            previous.cancel()
+        return cancellation
+
+    def finish_request(self, document, cancellation):
+        """Stop tracking a request, unless a newer one replaced it."""
+        with self._requests_lock:
+            if self._requests.get(document) is cancellation:
+                del self._requests[document]
+
+    def publish_results(self, request, results):
+        """Send results to Komodo for a request that has already returned."""
+        thread_manager = components.classes['@mozilla.org/thread-manager;1'].getService()
+        thread_manager.mainThread.dispatch(
+            ResultsPublisher(request, self.make_results(results)),
+            components.interfaces.nsIThread.DISPATCH_NORMAL,
+        )
 
-        return results
+    @staticmethod
+    def get_path(request):
+        try:
+            path = request.koDoc.file.path
+        except AttributeError:
+            # The document has never been saved.
+            path = None
+        return path or os.path.join(request.cwd or os.getcwd(), 'untitled.py')
+
+
+class ResultsPublisher(object):
+    """Update a lint buffer's results from Komodo's main thread."""
+
+    _com_interfaces_ = [components.interfaces.nsIRunnable]
+
+    def __init__(self, request, results):
+        self.request = request
+        self.results = results
+
+    def run(self):
+        try:
+            self.request.results = self.results
+            self.request.lintBuffer.reportResults(self.request)
+        except Exception:
+            LOG.exception('Error publishing lint results')
@@ -25,6 +25,7 @@ inference utils.
 __docformat__ = "restructuredtext en"
 
 from contextlib import contextmanager
+from types import MemberDescriptorType
 
 from logilab.common.compat import builtins
 
@@ -32,6 +33,9 @@ from logilab.astng import BUILTINS_MODULE
 from logilab.astng.exceptions import InferenceError, ASTNGError, \
                                        NotFoundError, UnresolvableName
 from logilab.astng.as_string import as_string
+from logilab.astng.manager import ASTNGManager
+
+MANAGER = ASTNGManager()
 
 BUILTINS_NAME = builtins.__name__
 
@@ -46,10 +50,23 @@ class Proxy(object):
     def __getattr__(self, name):
         if name == '_proxied':
             return getattr(self.__class__, '_proxied')
-        if name in self.__dict__:
-            return self.__dict__[name]
         return getattr(self._proxied, name)
 
+    def __getstate__(self):
+        return self.__dict__
+
+    def __setstate__(self, state):
+        # defined so that unpickling doesn't look it up through __getattr__
+        # before the proxied object is known. Nodes proxying builtins
+        # instances (Const, List...) give their slots apart, see
+        # NodeNG.__reduce_ex__
+        if isinstance(state, tuple):
+            state, slotstate = state
+            for name, value in slotstate.iteritems():
+                setattr(self, name, value)
+        if state:
+            self.__dict__.update(state)
+
     def infer(self, context=None):
         yield self
 
@@ -293,23 +310,63 @@ class Generator(Instance):
 
 # decorators ##################################################################
 
+def _infer_path(node, context, func, kwargs):
+    """infer node with func, handling the path of context"""
+    if context is None:
+        context = InferenceContext()
+    context.push(node)
+    yielded = set()
+    for res in func(node, context, **kwargs):
+        # unproxy only true instance, not const, tuple, dict...
+        if res.__class__ is Instance:
+            ares = res._proxied
+        else:
+            ares = res
+        if not ares in yielded:
+            yield res
+            yielded.add(ares)
+
+def _infer_cached(node, func):
+    """infer node with func without context, recording the results in the
+    inference cache of the manager once they have all been consumed
+    """
+    results = []
+    try:
+        for res in _infer_path(node, None, func, {}):
+            results.append(res)
+            yield res
+    except InferenceError, ex:
+        MANAGER.infer_cache[func, node] = (tuple(results), ex)
+        raise
+    MANAGER.infer_cache[func, node] = (tuple(results), None)
+
+def _replay(results, error):
+    for res in results:
+        yield res
+    raise error
+
 def path_wrapper(func):
-    """return the given infer function wrapped to handle the path"""
+    """return the given infer function wrapped to handle the path
+
+    Inference without context, as done by the users of the tree, is cached
+    until a module is evicted from or replaced in the manager's cache.
+    Inference with a context depends on its path, so it isn't cached.
+    """
     def wrapped(node, context=None, _func=func, **kwargs):
         """wrapper function handling context"""
-        if context is None:
-            context = InferenceContext()
-        context.push(node)
-        yielded = set()
-        for res in _func(node, context, **kwargs):
-            # unproxy only true instance, not const, tuple, dict...
-            if res.__class__ is Instance:
-                ares = res._proxied
-            else:
-                ares = res
-            if not ares in yielded:
-                yield res
-                yielded.add(ares)
+        if context is not None or kwargs:
+            return _infer_path(node, context, _func, kwargs)
+        try:
+            results, error = MANAGER.infer_cache[_func, node]
+        except KeyError:
+            MANAGER.infer_cache_misses += 1
+            if MANAGER.building:
+                return _infer_path(node, None, _func, kwargs)
+            return _infer_cached(node, _func)
+        MANAGER.infer_cache_hits += 1
+        if error is None:
+            return iter(results)
+        return _replay(results, error)
     return wrapped
 
 def yes_if_nothing_infered(func):
@@ -335,24 +392,105 @@ def raise_if_nothing_infered(func):
 
 # Node  ######################################################################
 
+# names of the slots of node classes, and of those starting as None, by class
+_SLOTS = {}
+
+def _class_slots(klass):
+    """return the names of the slots of the instances of a node class, and
+    those of its slots starting as None: the ones of NodeNG and of the fields
+    of the class, unless a class attribute overrides them
+    """
+    try:
+        return _SLOTS[klass]
+    except KeyError:
+        pass
+    names = []
+    for base in reversed(klass.__mro__):
+        for name in base.__dict__.get('__slots__', ()):
+            if name not in names:
+                names.append(name)
+    nones = tuple([name for name in names
+                   if (name in NodeNG.__slots__ or name in klass._astng_fields)
+                   and isinstance(getattr(klass, name), MemberDescriptorType)])
+    slots = _SLOTS[klass] = tuple(names), nones
+    return slots
+
+# the methods giving the enclosing nodes of a node, in the order of its chain
+_CHAIN_METHODS = ('statement', 'frame', 'scope', 'root')
+# the indexes and names of the methods of _CHAIN_METHODS overridden by node
+# classes, by class
+_CHAIN_OVERRIDES = {}
+
+def _chain_overrides(klass):
+    """return the indexes and names of the methods giving the enclosing
+    statement, frame, scope and root which are overridden by klass
+    """
+    try:
+        return _CHAIN_OVERRIDES[klass]
+    except KeyError:
+        pass
+    overrides = []
+    for index, name in enumerate(_CHAIN_METHODS):
+        for base in klass.__mro__:
+            if base is NodeNG:
+                break
+            if name in base.__dict__:
+                overrides.append((index, name))
+                break
+    overrides = _CHAIN_OVERRIDES[klass] = tuple(overrides)
+    return overrides
+
+def _new_node(klass):
+    """create an empty node when unpickling: its pickled state holds all
+    its set slots, those starting as None included
+    """
+    return object.__new__(klass)
+
 class NodeNG(object):
     """Base Class for all ASTNG node classes.
 
     It represents a node of the new abstract syntax tree.
+
+    Node classes list the attributes of their instances in __slots__, so that
+    they don't take the memory of an instance dictionary. The slots of the
+    attributes below and of the fields of the classes start as None, other
+    ones are unset until given a value.
     """
+    # attributes below are set by the builder module or by raw factories,
+    # parent is the parent node in the tree, _chain the tuple of what
+    # statement(), frame(), scope() and root() return once recorded (see
+    # _get_chain)
+    __slots__ = ('lineno', 'fromlineno', 'tolineno', 'col_offset', 'parent',
+                 '_chain')
     is_statement = False
     optional_assign = False # True  for For (and for Comprehension if py <3.0)
     is_function = False # True for Function nodes
-    # attributes below are set by the builder module or by raw factories
-    lineno = None
-    fromlineno = None
-    tolineno = None
-    col_offset = None
-    # parent node in the tree
-    parent = None
     # attributes containing child node(s) redefined in most concrete classes:
     _astng_fields = ()
 
+    def __new__(cls, *args, **kwargs):
+        node = object.__new__(cls)
+        for name in _class_slots(cls)[1]:
+            setattr(node, name, None)
+        return node
+
+    def __getstate__(self):
+        # the instance dictionary which nodes proxying builtins instances
+        # (Const, List...) get from Proxy is left out: it is created on use
+        state = {}
+        for name in _class_slots(self.__class__)[0]:
+            try:
+                state[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                continue
+        return None, state
+
+    def __reduce_ex__(self, protocol):
+        # unpickled nodes skip __new__ and, having no __setstate__, get their
+        # slots set by pickle itself: loading a tree from the astng cache must
+        # be cheaper than building it again
+        return _new_node, (self.__class__,), self.__getstate__()
+
     def _repr_name(self):
         """return self.name or self.attrname or '' for nice representation"""
         return getattr(self, 'name', getattr(self, 'attrname', ''))
@@ -405,8 +543,47 @@ class NodeNG(object):
             parent = parent.parent
         return False
 
+    def _get_chain(self):
+        """return what statement(), frame(), scope() and root() return for
+        this node, from what they return for its parent, or None if it isn't
+        in a module.
+
+        The answers are recorded once asked for a node of a module (which
+        records its own ones when created), so that they don't have to climb
+        the tree again: most nodes share the tuple of their parent.
+        """
+        parent = self.parent
+        if parent is None:
+            return None
+        chain = parent._chain or parent._get_chain()
+        if chain is None:
+            return None
+        overrides = _chain_overrides(self.__class__)
+        if self.is_statement or overrides:
+            chain = list(chain)
+            if self.is_statement:
+                chain[0] = self
+            for index, name in overrides:
+                chain[index] = getattr(self, name)()
+            chain = tuple(chain)
+        self._chain = chain
+        return chain
+
+    def reset_chains(self):
+        """forget the enclosing nodes recorded for this node and its
+        descendants, once it has been given another parent
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            node._chain = None
+            stack.extend(node.get_children())
+
     def statement(self):
         """return the first parent node marked as statement node"""
+        chain = self._chain or self._get_chain()
+        if chain is not None:
+            return chain[0]
         if self.is_statement:
             return self
         return self.parent.statement()
@@ -414,16 +591,25 @@ class NodeNG(object):
     def frame(self):
         """return the first parent frame node (i.e. Module, Function or Class)
         """
+        chain = self._chain or self._get_chain()
+        if chain is not None:
+            return chain[1]
         return self.parent.frame()
 
     def scope(self):
         """return the first node defining a new scope (i.e. Module, Function,
         Class, Lambda but also GenExpr)
         """
+        chain = self._chain or self._get_chain()
+        if chain is not None:
+            return chain[2]
         return self.parent.scope()
 
     def root(self):
         """return the root node of the tree, (i.e. a Module)"""
+        chain = self._chain or self._get_chain()
+        if chain is not None:
+            return chain[3]
         if self.parent:
             return self.parent.root()
         return self
@@ -576,6 +762,7 @@ class NodeNG(object):
 
 class Statement(NodeNG):
     """Statement node adding a few attributes"""
+    __slots__ = ()
     is_statement = True
 
     def next_sibling(self):
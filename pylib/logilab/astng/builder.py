@@ -25,8 +25,16 @@ at the same time.
 
 __docformat__ = "restructuredtext en"
 
-import sys, re
-from os.path import splitext, basename, dirname, exists, abspath
+import sys, re, os, gc
+from os.path import splitext, basename, dirname, exists, abspath, join
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+try:
+    from hashlib import sha1
+except ImportError:
+    from sha import new as sha1
 
 from logilab.common.modutils import modpath_from_file
 
@@ -35,6 +43,8 @@ from logilab.astng.raw_building import InspectBuilder
 from logilab.astng.rebuilder import TreeRebuilder
 from logilab.astng.manager import ASTNGManager
 from logilab.astng.bases import YES, Instance
+from logilab.astng.scoped_nodes import LocalsDictNodeNG
+from logilab.astng.__pkginfo__ import version as astng_version
 
 from _ast import PyCF_ONLY_AST
 def parse(string):
@@ -79,6 +89,120 @@ else:
         encoding = _guess_encoding(data)
         return stream, encoding, data
 
+# on disk cache of built modules ##############################################
+
+_CODE_STAMP = None
+
+def _code_stamp():
+    """return a stamp of the astng source files, so that pickles made by an
+    other version of the code are never loaded
+    """
+    global _CODE_STAMP
+    if _CODE_STAMP is None:
+        package_dir = dirname(abspath(__file__))
+        stamp = []
+        for filename in sorted(os.listdir(package_dir)):
+            if filename.endswith('.py'):
+                stat = os.stat(join(package_dir, filename))
+                stat = (filename, stat.st_size, int(stat.st_mtime))
+                stamp.append('%s:%s:%s' % stat)
+        _CODE_STAMP = ','.join(stamp)
+    return _CODE_STAMP
+
+def _cache_key(data, modname, path):
+    """return the name of the cache file for a module built from data"""
+    key = sha1(data)
+    key.update('\0'.join([astng_version, sys.version, _code_stamp(), modname,
+                          str(bool(path and '__init__.py' in path))]))
+    return key.hexdigest() + '.pickle'
+
+def _cache_file(cache_dir, data, modname, path):
+    """return the path of the cache file for a module built from data. Each
+    module has a directory of its own, which only keeps its latest pickle
+    """
+    module_key = sha1('\0'.join([modname, path and abspath(path) or '']))
+    return join(cache_dir, module_key.hexdigest(), _cache_key(data, modname, path))
+
+def _load_cached_module(cache_file):
+    """return the module pickled in cache_file, or None"""
+    try:
+        stream = open(cache_file, 'rb')
+    except IOError:
+        return None
+    # unpickling creates a lot of containers, none of them garbage: don't let
+    # them trigger collections, which would make up a third of the load time
+    # (the same goes for the states of the nodes when pickling)
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        try:
+            return pickle.load(stream)
+        except Exception:
+            # corrupted or incompatible, it will be built and dumped again
+            return None
+    finally:
+        if gc_enabled:
+            gc.enable()
+        stream.close()
+
+def _dump_cached_module(module, cache_file):
+    """pickle module in cache_file, ignoring any error: the cache is only an
+    optimization. The pickles of older sources of the module are removed, so
+    that the cache doesn't grow with each edit
+    """
+    # write to a temporary file first so that concurrent runs never read a
+    # partial pickle
+    tmp_file = '%s.%s.tmp' % (cache_file, os.getpid())
+    try:
+        cache_dir = dirname(cache_file)
+        if not exists(cache_dir):
+            os.makedirs(cache_dir)
+        stream = open(tmp_file, 'wb')
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            pickle.dump(module, stream, pickle.HIGHEST_PROTOCOL)
+        finally:
+            if gc_enabled:
+                gc.enable()
+            stream.close()
+        try:
+            os.rename(tmp_file, cache_file)
+        except OSError:
+            # the file may have been written meanwhile (rename can't replace
+            # an existing file on windows)
+            os.remove(tmp_file)
+        for filename in os.listdir(cache_dir):
+            if filename.endswith('.pickle') and filename != basename(cache_file):
+                os.remove(join(cache_dir, filename))
+    except Exception:
+        # includes RuntimeError for trees too deep to be pickled
+        try:
+            os.remove(tmp_file)
+        except Exception:
+            pass
+
+def _reorder_as_loaded(module):
+    """fill the dictionaries of the scoped nodes of module again in their
+    order of iteration, as unpickling does: dictionaries filled in an other
+    order may iterate in an other order, and so would the messages of pylint
+    depending on whether the module was just built or loaded from the cache
+    """
+    done = set()
+    stack = [module]
+    while stack:
+        node = stack.pop()
+        stack.extend(node.get_children())
+        if not isinstance(node, LocalsDictNodeNG):
+            # only scoped nodes have dictionaries (and a __dict__)
+            continue
+        for value in node.__dict__.itervalues():
+            if value.__class__ is dict and id(value) not in done:
+                done.add(id(value))
+                items = value.items()
+                value.clear()
+                value.update(items)
+
 # ast NG builder ##############################################################
 
 MANAGER = ASTNGManager()
@@ -126,28 +250,56 @@ class ASTNGBuilder(InspectBuilder):
             except ImportError:
                 modname = splitext(basename(path))[0]
         # build astng representation
-        node = self.string_build(data, modname, path)
+        node = self._cached_data_build(data, modname, path)
         node.file_encoding = encoding
-        return node
+        return self._post_build(node)
 
     def string_build(self, data, modname='', path=None):
         """build astng from source code string and return rebuilded astng"""
         module = self._data_build(data, modname, path)
-        self._manager.astng_cache[module.name] = module
-        # post tree building steps after we stored the module in the cache:
-        for from_node in module._from_nodes:
-            self.add_from_names_to_locals(from_node)
-        # handle delayed assattr nodes
-        for delayed in module._delayed_assattr:
-            self.delayed_assattr(delayed)
-        if modname:
-            for transformer in self._manager.transformers:
-                transformer(module)
+        return self._post_build(module)
+
+    def _post_build(self, module):
+        """store the module in the cache and handle delayed building steps"""
+        modname = module.name
+        self._manager.astng_cache[modname] = module
+        self._manager.building += 1
+        try:
+            # post tree building steps after we stored the module in the cache:
+            for from_node in module._from_nodes:
+                self.add_from_names_to_locals(from_node)
+            # handle delayed assattr nodes
+            for delayed in module._delayed_assattr:
+                self.delayed_assattr(delayed)
+            if modname:
+                for transformer in self._manager.transformers:
+                    transformer(module)
+        finally:
+            self._manager.building -= 1
+        return module
+
+    def _cached_data_build(self, data, modname, path):
+        """build tree node from data, or load it from the manager's cache
+        directory if the same source has already been built.
+
+        Only the rebuilt tree is cached: the delayed building steps done by
+        _post_build depend on other modules, so they are done again.
+        """
+        cache_dir = self._manager.cache_dir
+        if not cache_dir:
+            return self._data_build(data, modname, path)
+        cache_file = _cache_file(cache_dir, data, modname, path)
+        module = _load_cached_module(cache_file)
+        if module is None:
+            module = self._data_build(data, modname, path)
+            _dump_cached_module(module, cache_file)
+            _reorder_as_loaded(module)
+        else:
+            module.file = module.path = abspath(path)
         return module
 
     def _data_build(self, data, modname, path):
         """build tree node from data and add some informations"""
-        # this method could be wrapped with a pickle/cache function
         node = parse(data + '\n')
         if path is not None:
             node_file = abspath(path)
@@ -215,6 +367,9 @@ class ASTNGBuilder(InspectBuilder):
                 values = iattrs.setdefault(node.attrname, [])
                 if node in values:
                     continue
+                if infered.root() is not node.root():
+                    # inference results involving the other module may change
+                    self._manager.clear_infer_cache()
                 # get assign in __init__ first XXX useful ?
                 if frame.name == '__init__' and values and not \
                        values[0].frame().name == '__init__':
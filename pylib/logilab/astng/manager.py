@@ -57,6 +57,34 @@ def safe_repr(obj):
         return '???'
 
 
+class _ASTNGCache(dict):
+    """the modules cache of the manager, dropping the inference results cache
+    when a module is evicted or replaced by a rebuilt one: the results of any
+    module may refer to the nodes of the old tree
+    """
+
+    def __init__(self, infer_cache):
+        dict.__init__(self)
+        self._infer_cache = infer_cache
+
+    def __setitem__(self, modname, module):
+        if self.get(modname, module) is not module:
+            self._infer_cache.clear()
+        dict.__setitem__(self, modname, module)
+
+    def __delitem__(self, modname):
+        self._infer_cache.clear()
+        dict.__delitem__(self, modname)
+
+    def pop(self, modname, *default):
+        if modname in self:
+            self._infer_cache.clear()
+        return dict.pop(self, modname, *default)
+
+    def clear(self):
+        self._infer_cache.clear()
+        dict.clear(self)
+
 
 class ASTNGManager(OptionsProviderMixIn):
     """the astng manager, responsible to build astng from files
@@ -78,13 +106,25 @@ class ASTNGManager(OptionsProviderMixIn):
                  'help' : 'set the project name.'}),
                )
     brain = {}
+    # directory where built modules are pickled, keyed by the hash of their
+    # source, so that later runs don't have to parse them again. None
+    # disables the cache.
+    cache_dir = None
+    # number of modules being built: their trees are not complete yet, so
+    # inference results are not cached meanwhile
+    building = 0
+
     def __init__(self):
         self.__dict__ = ASTNGManager.brain
         if not self.__dict__:
             OptionsProviderMixIn.__init__(self)
             self.load_defaults()
+            # results of the inference of nodes without context, keyed by
+            # infer function and node (see bases.path_wrapper)
+            self.infer_cache = {}
+            self.infer_cache_hits = self.infer_cache_misses = 0
             # NOTE: cache entries are added by the [re]builder
-            self.astng_cache = {}
+            self.astng_cache = _ASTNGCache(self.infer_cache)
             self._mod_file_cache = {}
             self.transformers = []
 
@@ -266,6 +306,10 @@ class ASTNGManager(OptionsProviderMixIn):
                     project.add_module(astng)
         return project
 
+    def clear_infer_cache(self):
+        """drop the cached inference results, e.g. when a tree is modified"""
+        self.infer_cache.clear()
+
     def register_transformer(self, transformer):
         self.transformers.append(transformer)
 
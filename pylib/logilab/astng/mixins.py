@@ -38,6 +38,8 @@ from logilab.astng.exceptions import (ASTNGBuildingException, InferenceError,
 
 class BlockRangeMixIn(object):
     """override block range """
+    __slots__ = ()
+
     def set_line_info(self, lastchild):
         self.fromlineno = self.lineno
         self.tolineno = lastchild.tolineno
@@ -57,6 +59,7 @@ class BlockRangeMixIn(object):
 
 class FilterStmtsMixin(object):
     """Mixin for statement filtering and assignment type"""
+    __slots__ = ()
 
     def _get_filtered_stmts(self, _, node, _stmts, mystmt):
         """method used in _filter_stmts to get statemtents and trigger break"""
@@ -71,6 +74,7 @@ class FilterStmtsMixin(object):
 
 
 class AssignTypeMixin(object):
+    __slots__ = ()
 
     def ass_type(self):
         return self
@@ -87,6 +91,7 @@ class AssignTypeMixin(object):
 
 
 class ParentAssignTypeMixin(AssignTypeMixin):
+    __slots__ = ()
 
     def ass_type(self):
         return self.parent.ass_type()
@@ -95,6 +100,7 @@ class ParentAssignTypeMixin(AssignTypeMixin):
 
 class FromImportMixIn(FilterStmtsMixin):
     """MixIn for From and Import Nodes"""
+    __slots__ = ()
 
     def _infer_name(self, frame, name):
         return name
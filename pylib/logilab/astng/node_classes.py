@@ -21,11 +21,12 @@
 """
 
 import sys
+from bisect import bisect_left, bisect_right
 
 from logilab.astng import BUILTINS_MODULE
 from logilab.astng.exceptions import NoDefault
 from logilab.astng.bases import (NodeNG, Statement, Instance, InferenceContext,
-                                 _infer_stmts, YES)
+                                 _infer_stmts, YES, MANAGER)
 from logilab.astng.mixins import BlockRangeMixIn, AssignTypeMixin, \
                                  ParentAssignTypeMixin, FromImportMixIn
 
@@ -107,6 +108,7 @@ def are_exclusive(stmt1, stmt2, exceptions=None):
 class LookupMixIn(object):
     """Mixin looking up a name in the right scope
     """
+    __slots__ = ()
 
     def lookup(self, name):
         """lookup a variable name
@@ -118,8 +120,19 @@ class LookupMixIn(object):
         The lookup is starting from self's scope. If self is not a frame itself and
         the name is found in the inner frame locals, statements will be filtered
         to remove ignorable statements according to self's location
+
+        Results are cached in the manager's inference cache along with
+        inference results.
         """
-        return self.scope().scope_lookup(self, name)
+        key = ('lookup', self, name)
+        try:
+            return MANAGER.infer_cache[key]
+        except KeyError:
+            pass
+        result = self.scope().scope_lookup(self, name)
+        if not MANAGER.building:
+            MANAGER.infer_cache[key] = result
+        return result
 
     def ilookup(self, name):
         """infered lookup
@@ -162,11 +175,23 @@ class LookupMixIn(object):
             mylineno = 0
         _stmts = []
         _stmt_parents = []
-        for node in stmts:
-            stmt = node.statement()
-            # line filtering is on and we have reached our location, break
-            if mylineno > 0 and stmt.fromlineno > mylineno:
-                break
+        statements, maxlinenos, first_indexes, assign_resets, del_resets = \
+            _statements_table(stmts)
+        if mylineno > 0:
+            # line filtering is on, stop at the first statement after our
+            # location
+            end = bisect_right(maxlinenos, mylineno)
+        else:
+            end = len(stmts)
+        # the loop below may only break early on our own statement: start
+        # from the last assignment before it dropping the previous ones
+        end_resets = min(end, first_indexes.get(mystmt, end))
+        start = 0
+        for resets in (assign_resets.get(mystmt.parent, ()), del_resets):
+            index = bisect_left(resets, end_resets) - 1
+            if index >= 0:
+                start = max(start, resets[index])
+        for node, stmt in zip(stmts[start:end], statements[start:end]):
             assert hasattr(node, 'ass_type'), (node, node.scope(),
                                                node.scope().locals)
             ass_type = node.ass_type()
@@ -236,18 +261,68 @@ class LookupMixIn(object):
                 _stmt_parents.append(stmt.parent)
         return _stmts
 
+def _statements_table(stmts):
+    """return a table of the assignments stmts of a name, which _filter_stmts
+    uses to skip the assignments it doesn't have to look at:
+
+    * the statement of each assignment,
+    * for each assignment, the highest first line of the statements up to it,
+      to find the last one before some line with a binary search,
+    * the index of the first assignment of each statement: the filtering can
+      only stop early at the statement of the node looked up,
+    * the indexes of the assignments which drop the previous ones whatever
+      they are (see _filter_stmts): deletions, and names assigned by a
+      statement which doesn't assign them earlier, unless in a loop, by block.
+
+    Tables are cached in the manager's inference cache along with inference
+    results, until stmts changes.
+    """
+    key = ('statements', id(stmts))
+    try:
+        cached_stmts, table = MANAGER.infer_cache[key]
+    except KeyError:
+        pass
+    else:
+        if cached_stmts is stmts and len(table[0]) == len(stmts):
+            return table
+    statements = []
+    maxlinenos = []
+    first_indexes = {}
+    assign_resets = {}
+    del_resets = []
+    maxlineno = None
+    for index, node in enumerate(stmts):
+        stmt = node.statement()
+        statements.append(stmt)
+        maxlineno = max(maxlineno, stmt.fromlineno)
+        maxlinenos.append(maxlineno)
+        if stmt in first_indexes:
+            continue
+        first_indexes[stmt] = index
+        if isinstance(node, DelName):
+            del_resets.append(index)
+        elif isinstance(node, AssName) and not node.ass_type().optional_assign:
+            assign_resets.setdefault(stmt.parent, []).append(index)
+    table = statements, maxlinenos, first_indexes, assign_resets, del_resets
+    if not MANAGER.building:
+        MANAGER.infer_cache[key] = stmts, table
+    return table
+
 # Name classes
 
 class AssName(LookupMixIn, ParentAssignTypeMixin, NodeNG):
     """class representing an AssName node"""
+    __slots__ = ('name', '_handled')
 
 
 class DelName(LookupMixIn, ParentAssignTypeMixin, NodeNG):
     """class representing a DelName node"""
+    __slots__ = ('name',)
 
 
 class Name(LookupMixIn, NodeNG):
     """class representing a Name node"""
+    __slots__ = ('name',)
 
 
 
@@ -256,9 +331,8 @@ class Name(LookupMixIn, NodeNG):
 
 class Arguments(NodeNG, AssignTypeMixin):
     """class representing an Arguments node"""
+    __slots__ = ('args', 'defaults', 'vararg', 'kwarg')
     _astng_fields = ('args', 'defaults')
-    args = None
-    defaults = None
 
     def __init__(self, vararg=None, kwarg=None):
         self.vararg = vararg
@@ -335,54 +409,48 @@ def _format_args(args, defaults=None):
 
 class AssAttr(NodeNG, ParentAssignTypeMixin):
     """class representing an AssAttr node"""
+    __slots__ = ('expr', 'attrname')
     _astng_fields = ('expr',)
-    expr = None
 
 class Assert(Statement):
     """class representing an Assert node"""
+    __slots__ = ('test', 'fail')
     _astng_fields = ('test', 'fail',)
-    test = None
-    fail = None
 
 class Assign(Statement, AssignTypeMixin):
     """class representing an Assign node"""
+    __slots__ = ('targets', 'value')
     _astng_fields = ('targets', 'value',)
-    targets = None
-    value = None
 
 class AugAssign(Statement, AssignTypeMixin):
     """class representing an AugAssign node"""
+    __slots__ = ('target', 'value', 'op')
     _astng_fields = ('target', 'value',)
-    target = None
-    value = None
 
 class Backquote(NodeNG):
     """class representing a Backquote node"""
+    __slots__ = ('value',)
     _astng_fields = ('value',)
-    value = None
 
 class BinOp(NodeNG):
     """class representing a BinOp node"""
+    __slots__ = ('left', 'right', 'op')
     _astng_fields = ('left', 'right',)
-    left = None
-    right = None
 
 class BoolOp(NodeNG):
     """class representing a BoolOp node"""
+    __slots__ = ('values', 'op')
     _astng_fields = ('values',)
-    values = None
 
 class Break(Statement):
     """class representing a Break node"""
+    __slots__ = ()
 
 
 class CallFunc(NodeNG):
     """class representing a CallFunc node"""
+    __slots__ = ('func', 'args', 'starargs', 'kwargs')
     _astng_fields = ('func', 'args', 'starargs', 'kwargs')
-    func = None
-    args = None
-    starargs = None
-    kwargs = None
 
     def __init__(self):
         self.starargs = None
@@ -390,9 +458,8 @@ class CallFunc(NodeNG):
 
 class Compare(NodeNG):
     """class representing a Compare node"""
+    __slots__ = ('left', 'ops')
     _astng_fields = ('left', 'ops',)
-    left = None
-    ops = None
 
     def get_children(self):
         """override get_children for tuple fields"""
@@ -408,10 +475,8 @@ class Compare(NodeNG):
 
 class Comprehension(NodeNG):
     """class representing a Comprehension node"""
+    __slots__ = ('target', 'iter', 'ifs')
     _astng_fields = ('target', 'iter' ,'ifs')
-    target = None
-    iter = None
-    ifs = None
 
     optional_assign = True
     def ass_type(self):
@@ -434,6 +499,7 @@ class Comprehension(NodeNG):
 
 class Const(NodeNG, Instance):
     """represent a constant node like num, str, bool, None, bytes"""
+    __slots__ = ('value', 'name')
 
     def __init__(self, value=None):
         self.value = value
@@ -457,12 +523,13 @@ class Const(NodeNG, Instance):
 
 class Continue(Statement):
     """class representing a Continue node"""
+    __slots__ = ()
 
 
 class Decorators(NodeNG):
     """class representing a Decorators node"""
+    __slots__ = ('nodes',)
     _astng_fields = ('nodes',)
-    nodes = None
 
     def __init__(self, nodes=None):
         self.nodes = nodes
@@ -473,18 +540,19 @@ class Decorators(NodeNG):
 
 class DelAttr(NodeNG, ParentAssignTypeMixin):
     """class representing a DelAttr node"""
+    __slots__ = ('expr', 'attrname')
     _astng_fields = ('expr',)
-    expr = None
 
 
 class Delete(Statement, AssignTypeMixin):
     """class representing a Delete node"""
+    __slots__ = ('targets',)
     _astng_fields = ('targets',)
-    targets = None
 
 
 class Dict(NodeNG, Instance):
     """class representing a Dict node"""
+    __slots__ = ('items', 'name')
     _astng_fields = ('items',)
 
     def __init__(self, items=None):
@@ -525,24 +593,24 @@ class Dict(NodeNG, Instance):
 
 class Discard(Statement):
     """class representing a Discard node"""
+    __slots__ = ('value',)
     _astng_fields = ('value',)
-    value = None
 
 
 class Ellipsis(NodeNG):
     """class representing an Ellipsis node"""
+    __slots__ = ()
 
 
 class EmptyNode(NodeNG):
     """class representing an EmptyNode node"""
+    __slots__ = ('name', 'object')
 
 
 class ExceptHandler(Statement, AssignTypeMixin):
     """class representing an ExceptHandler node"""
+    __slots__ = ('type', 'name', 'body', 'blockstart_tolineno')
     _astng_fields = ('type', 'name', 'body',)
-    type = None
-    name = None
-    body = None
 
     def _blockstart_toline(self):
         if self.name:
@@ -567,24 +635,19 @@ class ExceptHandler(Statement, AssignTypeMixin):
 
 class Exec(Statement):
     """class representing an Exec node"""
+    __slots__ = ('expr', 'globals', 'locals')
     _astng_fields = ('expr', 'globals', 'locals',)
-    expr = None
-    globals = None
-    locals = None
 
 
 class ExtSlice(NodeNG):
     """class representing an ExtSlice node"""
+    __slots__ = ('dims',)
     _astng_fields = ('dims',)
-    dims = None
 
 class For(BlockRangeMixIn, AssignTypeMixin, Statement):
     """class representing a For node"""
+    __slots__ = ('target', 'iter', 'body', 'orelse', 'blockstart_tolineno')
     _astng_fields = ('target', 'iter', 'body', 'orelse',)
-    target = None
-    iter = None
-    body = None
-    orelse = None
 
     optional_assign = True
     def _blockstart_toline(self):
@@ -593,6 +656,7 @@ class For(BlockRangeMixIn, AssignTypeMixin, Statement):
 
 class From(FromImportMixIn, Statement):
     """class representing a From node"""
+    __slots__ = ('modname', 'names', 'level', 'name')
 
     def __init__(self,  fromname, names, level=0):
         self.modname = fromname
@@ -601,12 +665,13 @@ class From(FromImportMixIn, Statement):
 
 class Getattr(NodeNG):
     """class representing a Getattr node"""
+    __slots__ = ('expr', 'attrname')
     _astng_fields = ('expr',)
-    expr = None
 
 
 class Global(Statement):
     """class representing a Global node"""
+    __slots__ = ('names',)
 
     def __init__(self, names):
         self.names = names
@@ -617,10 +682,8 @@ class Global(Statement):
 
 class If(BlockRangeMixIn, Statement):
     """class representing an If node"""
+    __slots__ = ('test', 'body', 'orelse', 'blockstart_tolineno')
     _astng_fields = ('test', 'body', 'orelse')
-    test = None
-    body = None
-    orelse = None
 
     def _blockstart_toline(self):
         return self.test.tolineno
@@ -637,30 +700,30 @@ class If(BlockRangeMixIn, Statement):
 
 class IfExp(NodeNG):
     """class representing an IfExp node"""
+    __slots__ = ('test', 'body', 'orelse')
     _astng_fields = ('test', 'body', 'orelse')
-    test = None
-    body = None
-    orelse = None
 
 
 class Import(FromImportMixIn, Statement):
     """class representing an Import node"""
+    __slots__ = ('names',)
 
 
 class Index(NodeNG):
     """class representing an Index node"""
+    __slots__ = ('value',)
     _astng_fields = ('value',)
-    value = None
 
 
 class Keyword(NodeNG):
     """class representing a Keyword node"""
+    __slots__ = ('value', 'arg')
     _astng_fields = ('value',)
-    value = None
 
 
 class List(NodeNG, Instance, ParentAssignTypeMixin):
     """class representing a List node"""
+    __slots__ = ('elts', 'name')
     _astng_fields = ('elts',)
 
     def __init__(self, elts=None):
@@ -681,6 +744,7 @@ class List(NodeNG, Instance, ParentAssignTypeMixin):
 
 class Nonlocal(Statement):
     """class representing a Nonlocal node"""
+    __slots__ = ('names',)
 
     def __init__(self, names):
         self.names = names
@@ -691,26 +755,23 @@ class Nonlocal(Statement):
 
 class Pass(Statement):
     """class representing a Pass node"""
+    __slots__ = ()
 
 
 class Print(Statement):
     """class representing a Print node"""
+    __slots__ = ('dest', 'values', 'nl')
     _astng_fields = ('dest', 'values',)
-    dest = None
-    values = None
 
 
 class Raise(Statement):
     """class representing a Raise node"""
-    exc = None
     if sys.version_info < (3, 0):
+        __slots__ = ('exc', 'inst', 'tback')
         _astng_fields = ('exc', 'inst', 'tback')
-        inst = None
-        tback = None
     else:
+        __slots__ = ('exc', 'cause')
         _astng_fields = ('exc', 'cause')
-        exc = None
-        cause = None
 
     def raises_not_implemented(self):
         if not self.exc:
@@ -722,12 +783,13 @@ class Raise(Statement):
 
 class Return(Statement):
     """class representing a Return node"""
+    __slots__ = ('value',)
     _astng_fields = ('value',)
-    value = None
 
 
 class Set(NodeNG, Instance, ParentAssignTypeMixin):
     """class representing a Set node"""
+    __slots__ = ('elts',)
     _astng_fields = ('elts',)
 
     def __init__(self, elts=None):
@@ -745,30 +807,25 @@ class Set(NodeNG, Instance, ParentAssignTypeMixin):
 
 class Slice(NodeNG):
     """class representing a Slice node"""
+    __slots__ = ('lower', 'upper', 'step')
     _astng_fields = ('lower', 'upper', 'step')
-    lower = None
-    upper = None
-    step = None
 
 class Starred(NodeNG, ParentAssignTypeMixin):
     """class representing a Starred node"""
+    __slots__ = ('value',)
     _astng_fields = ('value',)
-    value = None
 
 
 class Subscript(NodeNG):
     """class representing a Subscript node"""
+    __slots__ = ('value', 'slice')
     _astng_fields = ('value', 'slice')
-    value = None
-    slice = None
 
 
 class TryExcept(BlockRangeMixIn, Statement):
     """class representing a TryExcept node"""
+    __slots__ = ('body', 'handlers', 'orelse', 'blockstart_tolineno')
     _astng_fields = ('body', 'handlers', 'orelse',)
-    body = None
-    handlers = None
-    orelse = None
 
     def _infer_name(self, frame, name):
         return name
@@ -791,9 +848,8 @@ class TryExcept(BlockRangeMixIn, Statement):
 
 class TryFinally(BlockRangeMixIn, Statement):
     """class representing a TryFinally node"""
+    __slots__ = ('body', 'finalbody', 'blockstart_tolineno')
     _astng_fields = ('body', 'finalbody',)
-    body = None
-    finalbody = None
 
     def _blockstart_toline(self):
         return self.lineno
@@ -810,6 +866,7 @@ class TryFinally(BlockRangeMixIn, Statement):
 
 class Tuple(NodeNG, Instance, ParentAssignTypeMixin):
     """class representing a Tuple node"""
+    __slots__ = ('elts', 'name')
     _astng_fields = ('elts',)
 
     def __init__(self, elts=None):
@@ -830,16 +887,14 @@ class Tuple(NodeNG, Instance, ParentAssignTypeMixin):
 
 class UnaryOp(NodeNG):
     """class representing an UnaryOp node"""
+    __slots__ = ('operand', 'op')
     _astng_fields = ('operand',)
-    operand = None
 
 
 class While(BlockRangeMixIn, Statement):
     """class representing a While node"""
+    __slots__ = ('test', 'body', 'orelse', 'blockstart_tolineno')
     _astng_fields = ('test', 'body', 'orelse',)
-    test = None
-    body = None
-    orelse = None
 
     def _blockstart_toline(self):
         return self.test.tolineno
@@ -851,10 +906,8 @@ class While(BlockRangeMixIn, Statement):
 
 class With(BlockRangeMixIn, AssignTypeMixin, Statement):
     """class representing a With node"""
+    __slots__ = ('expr', 'vars', 'body', 'blockstart_tolineno')
     _astng_fields = ('expr', 'vars', 'body')
-    expr = None
-    vars = None
-    body = None
 
     def _blockstart_toline(self):
         if self.vars:
@@ -865,8 +918,8 @@ class With(BlockRangeMixIn, AssignTypeMixin, Statement):
 
 class Yield(NodeNG):
     """class representing a Yield node"""
+    __slots__ = ('value',)
     _astng_fields = ('value',)
-    value = None
 
 # constants ##############################################################
 
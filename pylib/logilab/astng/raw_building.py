@@ -322,32 +322,51 @@ class InspectBuilder(object):
 
 _CONST_PROXY = {}
 def astng_boot_strapping():
-    """astng boot strapping the builtins module"""
+    """astng boot strapping the builtins module
+
+    This is done on first use of the proxies of constants (see
+    _builtin_proxy), so that importing astng doesn't build builtins.
+    """
     # this boot strapping is necessary since we need the Const nodes to
     # inspect_build builtins, and then we can proxy Const
-    builder = InspectBuilder()
     from logilab.common.compat import builtins
-    astng_builtin = builder.inspect_build(builtins)
-    for cls, node_cls in CONST_CLS.items():
+    astng_builtin = MANAGER.astng_from_module(builtins)
+    proxies = {}
+    for cls in CONST_CLS:
         if cls is type(None):
             proxy = build_class('NoneType')
             proxy.parent = astng_builtin
         else:
             proxy = astng_builtin.getattr(cls.__name__)[0] # XXX
-        if cls in (dict, list, set, tuple):
-            node_cls._proxied = proxy
-        else:
-            _CONST_PROXY[cls] = proxy
+        proxies[cls] = proxy
+    _CONST_PROXY.update(proxies)
 
-astng_boot_strapping()
+def _builtin_proxy(cls):
+    if not _CONST_PROXY:
+        astng_boot_strapping()
+    return _CONST_PROXY[cls]
 
 # TODO : find a nicer way to handle this situation;
 # However __proxied introduced an
 # infinite recursion (see https://bugs.launchpad.net/pylint/+bug/456870)
 def _set_proxied(const):
-    return _CONST_PROXY[const.value.__class__]
+    return _builtin_proxy(const.value.__class__)
 Const._proxied = property(_set_proxied)
 
+class _ProxiedDescriptor(object):
+    """_proxied of the node classes of builtin containers, available on the
+    classes themselves (e.g. List._proxied)
+    """
+    def __init__(self, cls):
+        self.cls = cls
+
+    def __get__(self, node, node_cls=None):
+        return _builtin_proxy(self.cls)
+
+for _cls in (dict, list, set, tuple):
+    CONST_CLS[_cls]._proxied = _ProxiedDescriptor(_cls)
+del _cls
+
 # FIXME : is it alright that Generator._proxied is not a astng node?
 Generator._proxied = MANAGER.infer_astng_from_something(type(a for a in ()))
 
@@ -28,7 +28,7 @@ __doctype__ = "restructuredtext en"
 import sys
 from itertools import chain
 
-from logilab.common.compat import builtins
+from logilab.common.compat import builtins, StringIO
 from logilab.common.decorators import cached
 
 from logilab.astng import BUILTINS_MODULE
@@ -76,6 +76,9 @@ def std_special_attributes(self, name, add_locals=True):
     raise NotFoundError(name)
 
 MANAGER = ASTNGManager()
+# keys of the ancestors being computed, see Class.ancestors
+_ANCESTORS_IN_PROGRESS = set()
+
 def builtin_lookup(name):
     """lookup a name into the builtin module
     return the list of matching statements and the astng for the builtin
@@ -98,6 +101,10 @@ class LocalsDictNodeNG(LookupMixIn, NodeNG):
     to locals information
     """
 
+    def __getstate__(self):
+        # unlike other nodes, scoped nodes have an instance dictionary
+        return self.__dict__, NodeNG.__getstate__(self)[1]
+
     # attributes below are set by the builder module or by raw factories
 
     # dictionary of locals with name as key and node defining the local as
@@ -158,6 +165,9 @@ class LocalsDictNodeNG(LookupMixIn, NodeNG):
         """append a child, linking it in the tree"""
         self.body.append(child)
         child.parent = self
+        if child._chain is not None:
+            # forget the enclosing nodes recorded while it was elsewhere
+            child.reset_chains()
 
     def add_local_node(self, child_node, name=None):
         """append a child which should alter locals to the given node"""
@@ -220,6 +230,9 @@ class Module(LocalsDictNodeNG):
     # the file from which as been extracted the astng representation. It may
     # be None if the representation has been built from a built-in module
     file = None
+    # the source code of a module, used instead of `file` by `file_stream` when
+    # set by the caller, so the source doesn't have to be on disk
+    file_bytes = None
     # encoding of python source file, so we can get unicode out of it (python2
     # only)
     file_encoding = None
@@ -245,9 +258,13 @@ class Module(LocalsDictNodeNG):
         self.pure_python = pure_python
         self.locals = self.globals = {}
         self.body = []
+        # a module is its own statement, frame, scope and root
+        self._chain = (self, self, self, self)
 
     @property
     def file_stream(self):
+        if self.file_bytes is not None:
+            return StringIO(self.file_bytes)
         if self.file is not None:
             return open(self.file)
         return None
@@ -451,9 +468,8 @@ class SetComp(ComprehensionScope):
 
 class _ListComp(NodeNG):
     """class representing a ListComp node"""
+    __slots__ = ('elt', 'generators')
     _astng_fields = ('elt', 'generators')
-    elt = None
-    generators = None
 
 if sys.version_info >= (3, 0):
     class ListComp(_ListComp, ComprehensionScope):
@@ -463,6 +479,7 @@ if sys.version_info >= (3, 0):
 else:
     class ListComp(_ListComp):
         """class representing a ListComp node"""
+        __slots__ = ()
 
 # Function  ###################################################################
 
@@ -776,13 +793,45 @@ class Class(Statement, LocalsDictNodeNG, FilterStmtsMixin):
         :param recurs:
           boolean indicating if it should recurse or return direct
           ancestors only
+
+        Without context, ancestors are cached in the manager's inference cache
+        along with inference results.
         """
+        if context is not None:
+            return self._infer_ancestors(recurs, context)
+        key = ('ancestors', self, recurs)
+        try:
+            return iter(MANAGER.infer_cache[key])
+        except KeyError:
+            pass
+        if MANAGER.building or key in _ANCESTORS_IN_PROGRESS:
+            # base classes inheriting from this class, let inference handle it
+            return self._infer_ancestors(recurs, InferenceContext())
+        _ANCESTORS_IN_PROGRESS.add(key)
+        try:
+            if recurs:
+                ancestors = []
+                yielded = set([self])
+                # ancestors of the bases are cached as well
+                for baseobj in self.ancestors(False):
+                    if baseobj in yielded:
+                        continue
+                    for ancestor in chain((baseobj,), baseobj.ancestors()):
+                        if ancestor not in yielded:
+                            yielded.add(ancestor)
+                            ancestors.append(ancestor)
+            else:
+                ancestors = list(self._infer_ancestors(False, InferenceContext()))
+        finally:
+            _ANCESTORS_IN_PROGRESS.discard(key)
+        MANAGER.infer_cache[key] = ancestors
+        return iter(ancestors)
+
+    def _infer_ancestors(self, recurs, context):
         # FIXME: should be possible to choose the resolution order
         # XXX inference make infinite loops possible here (see BaseTransformer
         # manipulation in the builder module for instance)
         yielded = set([self])
-        if context is None:
-            context = InferenceContext()
         for stmt in self.bases:
             with context.restore_path():
                 try:
@@ -808,9 +857,30 @@ class Class(Statement, LocalsDictNodeNG, FilterStmtsMixin):
         """return an iterator on astng representation of parent classes
         which have <name> defined in their locals
         """
-        for astng in self.ancestors(context=context):
-            if name in astng:
-                yield astng
+        if context is None:
+            return iter(self._locals_ancestors().get(name, ()))
+        return (astng for astng in self.ancestors(context=context)
+                if name in astng)
+
+    def _locals_ancestors(self):
+        """return a dictionary mapping names to the ancestors defining them in
+        their locals, cached as ancestors are
+        """
+        key = ('locals ancestors', self)
+        try:
+            return MANAGER.infer_cache[key]
+        except KeyError:
+            pass
+        index = {}
+        for astng in self.ancestors():
+            for name in astng.locals:
+                try:
+                    index[name].append(astng)
+                except KeyError:
+                    index[name] = [astng]
+        if not MANAGER.building:
+            MANAGER.infer_cache[key] = index
+        return index
 
     def instance_attr_ancestors(self, name, context=None):
         """return an iterator on astng representation of parent classes
@@ -884,8 +954,8 @@ class Class(Statement, LocalsDictNodeNG, FilterStmtsMixin):
             return std_special_attributes(self, name)
         # don't modify the list in self.locals!
         values = list(values)
-        for classnode in self.ancestors(recurs=True, context=context):
-            values += classnode.locals.get(name, [])
+        for classnode in self.local_attr_ancestors(name, context):
+            values += classnode.locals[name]
         if not values:
             raise NotFoundError(name)
         return values
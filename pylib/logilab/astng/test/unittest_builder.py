@@ -19,12 +19,16 @@
 
 import unittest
 import sys
+import os
+import shutil
+import tempfile
 from os.path import join, abspath, dirname
 
 from logilab.common.testlib import TestCase, unittest_main
 from pprint import pprint
 
-from logilab.astng import BUILTINS_MODULE, builder, nodes, InferenceError, NotFoundError
+from logilab.astng import BUILTINS_MODULE, builder, nodes, scoped_nodes, \
+     InferenceError, NotFoundError
 from logilab.astng.nodes import Module
 from logilab.astng.bases import YES, BUILTINS_NAME
 from logilab.astng.as_string import as_string
@@ -298,6 +302,21 @@ class BuilderTC(TestCase):
             self.assertIsInstance(builtin_astng['Exception'], nodes.Class)
             self.assertIsInstance(builtin_astng['NotImplementedError'], nodes.Class)
 
+    def test_boot_strapping(self):
+        """check the proxies of constants are set up on first use"""
+        from logilab.astng import raw_building
+        builtin_astng = MANAGER.astng_from_module_name(BUILTINS_NAME)
+        proxies = raw_building._CONST_PROXY.copy()
+        raw_building._CONST_PROXY.clear()
+        try:
+            self.assertIs(nodes.Const(1)._proxied, builtin_astng['int'])
+            self.assertIs(nodes.List._proxied, builtin_astng['list'])
+            self.assertIs(nodes.Dict()._proxied, builtin_astng['dict'])
+            self.assertEqual(nodes.Const(None)._proxied.name, 'NoneType')
+        finally:
+            raw_building._CONST_PROXY.clear()
+            raw_building._CONST_PROXY.update(proxies)
+
     def test_inspect_build1(self):
         time_astng = MANAGER.astng_from_module_name('time')
         self.assertTrue(time_astng)
@@ -586,6 +605,55 @@ class ModuleBuildTC(FileBuildTC):
         self.module = abuilder.module_build(test_module)
 
 
+class CachedFileBuildTC(FileBuildTC):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        MANAGER.cache_dir = self.cache_dir
+        abuilder = builder.ASTNGBuilder()
+        self.built = abuilder.file_build(join(DATA, 'module.py'), 'data.module')
+        # the second build must not parse the source again
+        abuilder._data_build = None
+        self.module = abuilder.file_build(join(DATA, 'module.py'), 'data.module')
+
+    def tearDown(self):
+        MANAGER.cache_dir = None
+        shutil.rmtree(self.cache_dir)
+
+    def test_loaded_from_cache(self):
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        self.assertIsNot(self.module, self.built)
+        self.assertEqual(self.module.as_string(), self.built.as_string())
+
+    def test_locals_order(self):
+        scopes = [list(self.built.nodes_of_class(scoped_nodes.LocalsDictNodeNG)),
+                  list(self.module.nodes_of_class(scoped_nodes.LocalsDictNodeNG))]
+        for built, loaded in zip(*scopes):
+            self.assertEqual(built.locals.keys(), loaded.locals.keys())
+
+    def cache_files(self):
+        return [join(module_dir, filename)
+                for module_dir in os.listdir(self.cache_dir)
+                for filename in os.listdir(join(self.cache_dir, module_dir))]
+
+    def test_key_depends_on_source(self):
+        abuilder = builder.ASTNGBuilder()
+        abuilder.string_build('x = 1', 'data.module', join(DATA, 'module.py'))
+        old_files = self.cache_files()
+        self.assertEqual(len(old_files), 1)
+        abuilder._cached_data_build('x = 1', 'data.module', join(DATA, 'module.py'))
+        new_files = self.cache_files()
+        # the pickle of the older source was replaced
+        self.assertEqual(len(new_files), 1)
+        self.assertNotEqual(new_files, old_files)
+        self.assertEqual(self.module.file, self.built.file)
+
+    def test_modules_cached_apart(self):
+        abuilder = builder.ASTNGBuilder()
+        abuilder._cached_data_build('x = 1', 'data.other', join(DATA, 'other.py'))
+        self.assertEqual(len(self.cache_files()), 2)
+
+
 class MoreTC(TestCase):
 
     def setUp(self):
@@ -674,6 +742,16 @@ class A(object):
         astng = self.builder.string_build(code)
         self.assertEqual(astng['A']['hop'].type, 'classmethod')
 
+    def test_string_build_file_stream(self):
+        '''the source of a module built from a string doesn't need a file'''
+        code = 'a = 1\nb = 2\n'
+        astng = self.builder.string_build(code, 'unsaved', '/no/such/unsaved.py')
+        self.assertIsNone(astng.file_bytes)
+        astng.file_bytes = code
+        self.assertEqual(astng.file_stream.read(), code)
+        astng = self.builder.file_build(join(DATA, 'format.py'))
+        self.assertIsNone(astng.file_bytes)
+
 
 if sys.version_info < (3, 0):
     guess_encoding = builder._guess_encoding
@@ -25,7 +25,7 @@ from logilab.common.testlib import TestCase, unittest_main
 from logilab.astng import InferenceError, builder, nodes
 from logilab.astng.inference import infer_end as inference_infer_end
 from logilab.astng.bases import YES, Instance, BoundMethod, UnboundMethod,\
-                                path_wrapper, BUILTINS_NAME
+                                path_wrapper, BUILTINS_NAME, InferenceContext
 
 def get_name_node(start_from, name, index=0):
     return [n for n in start_from.nodes_of_class(nodes.Name) if n.name == name][index]
@@ -46,6 +46,38 @@ class InferenceUtilsTC(TestCase):
                               infer_default(1).next)
         self.assertEqual(infer_end(1).next(), 1)
 
+    def test_infer_cache(self):
+        astng = builder.string_build('''
+class A:
+    attr = 1
+a = A().attr
+b = undefined
+''', 'infer_cache')
+        manager = builder._manager
+        getattr_node = astng['a'].parent.value
+        hits, misses = manager.infer_cache_hits, manager.infer_cache_misses
+        infered = list(getattr_node.infer())
+        self.assertEqual(manager.infer_cache_misses, misses + 1)
+        self.assertEqual(list(getattr_node.infer()), infered)
+        self.assertEqual(manager.infer_cache_hits, hits + 1)
+        # errors are cached as well
+        name_node = astng['b'].parent.value
+        self.assertRaises(InferenceError, list, name_node.infer())
+        self.assertRaises(InferenceError, list, name_node.infer())
+        self.assertEqual(manager.infer_cache_hits, hits + 2)
+        # results of partially consumed inference are not cached
+        name_node = getattr_node.expr.func
+        name_node.infer().next()
+        self.assertEqual(name_node.infer().next().name, 'A')
+        self.assertEqual(manager.infer_cache_misses, misses + 4)
+        # inference with a context is not cached
+        self.assertEqual(list(getattr_node.infer(InferenceContext())), infered)
+        self.assertEqual(manager.infer_cache_hits, hits + 2)
+        # rebuilding the module drops the cache
+        builder.string_build('', 'infer_cache')
+        self.assertEqual(list(getattr_node.infer()), infered)
+        self.assertEqual(manager.infer_cache_misses, misses + 5)
+
 if sys.version_info < (3, 0):
     EXC_MODULE = 'exceptions'
 else:
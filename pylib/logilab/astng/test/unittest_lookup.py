@@ -355,5 +355,38 @@ def run1():
         stmts = astng['run1'].lookup('Frobbel')[1]
         self.assertEqual(len(stmts), 0)
 
+    def test_many_assignments(self):
+        code = ['''
+def func(x):
+    return x
+''']
+        code += ['x = %s' % i for i in range(100)]
+        code += ['''
+if x:
+    x = None
+else:
+    x = 1
+print x
+for x in range(3):
+    x.real
+del x
+print x
+x = 2
+print x
+''']
+        astng = builder.string_build('\n'.join(code), __name__, __file__)
+        names = [node for node in astng.nodes_of_class(nodes.Name)
+                 if node.name == 'x' and node.scope() is astng]
+        linenos = [[stmt.lineno for stmt in name.lookup('x')[1]]
+                   for name in names]
+        self.assertEqual(linenos, [[104], [104, 107, 109], [111], [], [115]])
+        self.assertEqual([stmt.lineno for stmt in
+                          astng['func'].body[0].value.lookup('x')[1]], [2])
+        # lookups are cached until the module is rebuilt
+        self.assertIs(names[1].lookup('x'), names[1].lookup('x'))
+        builder.string_build('', __name__, __file__)
+        self.assertEqual([stmt.lineno for stmt in names[1].lookup('x')[1]],
+                         [104, 107, 109])
+
 if __name__ == '__main__':
     unittest_main()
@@ -18,10 +18,12 @@
 """tests for specific behaviour of astng nodes
 """
 import sys
+import pickle
 
 from logilab.common import testlib
 from logilab.astng.node_classes import unpack_infer
-from logilab.astng.bases import YES, InferenceContext
+from logilab.astng.bases import YES, InferenceContext, Instance
+from logilab.astng.scoped_nodes import LocalsDictNodeNG
 from logilab.astng.exceptions import ASTNGBuildingException, NotFoundError
 from logilab.astng import BUILTINS_MODULE, builder, nodes
 from logilab.astng.as_string import as_string
@@ -413,5 +415,95 @@ class EllipsisNodeTC(testlib.TestCase):
         ast = abuilder.string_build('a[...]').body[0]
         self.assertEqual(ast.as_string(), 'a[...]')
 
+class SlotsTC(testlib.TestCase):
+
+    def test_no_instance_dict(self):
+        for klass in nodes.ALL_NODE_CLASSES:
+            # Const, List... are proxies of builtins instances
+            if issubclass(klass, (LocalsDictNodeNG, Instance)):
+                self.assertNotEqual(klass.__dictoffset__, 0, klass)
+            else:
+                self.assertEqual(klass.__dictoffset__, 0, klass)
+        astng = abuilder.string_build('def func(arg):\n    print arg.attr\n')
+        getattr_node = astng['func'].body[0].values[0]
+        self.assertRaises(AttributeError, setattr, getattr_node, 'attr', 1)
+
+    def test_defaults(self):
+        node = nodes.Getattr()
+        self.assertEqual(node.expr, None)
+        self.assertEqual(node.lineno, None)
+        self.assertEqual(node.parent, None)
+        self.assertFalse(hasattr(node, 'attrname'))
+        # class attributes still override the slots defaults
+        self.assertEqual(nodes.Module('test', None).lineno, 0)
+
+    def test_pickle(self):
+        astng = abuilder.string_build('x = [a.b for a in range(3)]\n')
+        loaded = pickle.loads(pickle.dumps(astng, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(loaded.as_string(), astng.as_string())
+        self.assertEqual(sorted(loaded.locals), sorted(astng.locals))
+        getattr_node = loaded.body[0].value.elt
+        self.assertEqual(getattr_node.attrname, 'b')
+        self.assertEqual(getattr_node.lineno, 1)
+        self.assertIs(getattr_node.parent, loaded.body[0].value)
+        self.assertFalse(hasattr(getattr_node, '__dict__'))
+
+    def test_pickle_proxy_nodes(self):
+        astng = abuilder.string_build('x = 1\ndef func():\n    return\n')
+        for protocol in (0, pickle.HIGHEST_PROTOCOL):
+            loaded = pickle.loads(pickle.dumps(astng, protocol))
+            const = loaded.body[0].value
+            self.assertEqual(const.value, 1)
+            self.assertIs(const.parent, loaded.body[0])
+            self.assertEqual(const.pytype(), '%s.int' % BUILTINS_MODULE)
+            # fields starting as None are kept, although unpickled nodes
+            # don't go through NodeNG.__new__
+            self.assertIsNone(loaded['func'].body[0].value)
+            self.assertIsNone(loaded['func'].decorators)
+
+class ChainTC(testlib.TestCase):
+    CODE = '''
+class Klass:
+    @decorator(arg)
+    def method(self):
+        return lambda x: [y for y in (z for z in x)]
+'''
+
+    def test_recorded(self):
+        astng = abuilder.string_build(self.CODE, 'chain')
+        klass = astng['Klass']
+        method = klass['method']
+        arg = method.decorators.nodes[0].args[0]
+        self.assertIs(arg.statement(), method)
+        self.assertIs(arg.frame(), method)
+        self.assertIs(arg.scope(), klass)
+        self.assertIs(arg.root(), astng)
+        lambda_ = method.body[0].value
+        genexpr = lambda_.body.generators[0].iter
+        x_name = genexpr.generators[0].iter
+        self.assertIs(x_name.statement(), method.body[0])
+        self.assertIs(x_name.frame(), lambda_)
+        self.assertIs(x_name.scope(), genexpr)
+        self.assertIs(genexpr.frame(), lambda_)
+        # nodes share the chain of their parent when they answer like it
+        self.assertIs(x_name._chain, genexpr._chain)
+        self.assertIsNot(genexpr._chain, lambda_._chain)
+        loaded = pickle.loads(pickle.dumps(astng, pickle.HIGHEST_PROTOCOL))
+        self.assertIs(loaded.body[0].body[0].root(), loaded)
+
+    def test_reparent(self):
+        astng = abuilder.string_build(self.CODE, 'chain')
+        other = abuilder.string_build('class Other:\n    pass\n', 'other')
+        method = astng['Klass']['method']
+        self.assertIs(method.body[0].value.body.root(), astng)
+        self.assertIs(method.decorators.scope(), astng['Klass'])
+        other['Other'].add_local_node(method)
+        self.assertIs(method.body[0].value.frame(), method.body[0].value)
+        self.assertIs(method.body[0].statement(), method.body[0])
+        self.assertIs(method.body[0].value.body.scope(), method.body[0].value)
+        self.assertIs(method.body[0].value.root(), other)
+        self.assertIs(method.decorators.scope(), other['Other'])
+        self.assertIs(method.args.frame(), method)
+
 if __name__ == '__main__':
     testlib.unittest_main()
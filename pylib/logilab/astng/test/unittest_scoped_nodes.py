@@ -26,7 +26,8 @@ from logilab.common.testlib import TestCase, unittest_main
 
 from logilab.astng import builder, nodes, scoped_nodes, \
      BUILTINS_MODULE, InferenceError, NotFoundError
-from logilab.astng.bases import Instance, BoundMethod, UnboundMethod
+from logilab.astng.bases import Instance, BoundMethod, UnboundMethod, \
+     InferenceContext
 
 abuilder = builder.ASTNGBuilder()
 DATA = join(dirname(abspath(__file__)), 'data')
@@ -452,6 +453,58 @@ A.__bases__ += (B,)
         ancs = [a.name for a in klass.ancestors()]
         self.assertEqual(ancs, ['YOUPI', 'YO'])
 
+    def test_ancestors_cache(self):
+        data = '''
+class A(object):
+    attr = 1
+
+class B(A):
+    pass
+
+class C(B, A):
+    attr = 2
+
+class D(C):
+    pass
+'''
+        astng = abuilder.string_build(data, 'ancestors_cache')
+        klass = astng['D']
+        ancestors = list(klass.ancestors())
+        self.assertEqual([a.name for a in ancestors], ['C', 'B', 'A', 'object'])
+        self.assertEqual(list(klass.ancestors(context=InferenceContext())),
+                         ancestors)
+        self.assertEqual(list(klass.ancestors()), ancestors)
+        self.assertEqual([a.name for a in klass.ancestors(recurs=False)], ['C'])
+        self.assertEqual([a.name for a in klass.local_attr_ancestors('attr')],
+                         ['C', 'A'])
+        self.assertEqual([a.name for a in klass.local_attr_ancestors(
+            'attr', InferenceContext())], ['C', 'A'])
+        self.assertEqual(len(klass.getattr('attr')), 2)
+
+    def test_ancestors_cache_invalidation(self):
+        abuilder.string_build('''
+class Base(object):
+    attr = 1
+''', 'ancestors_base')
+        astng = abuilder.string_build('''
+from ancestors_base import Base
+class Klass(Base):
+    pass
+''', 'ancestors_cache')
+        klass = astng['Klass']
+        self.assertEqual([a.name for a in klass.ancestors()], ['Base', 'object'])
+        self.assertEqual(len(klass.getattr('attr')), 1)
+        # rebuilding the module of an ancestor drops the cache
+        abuilder.string_build('''
+class Mixin:
+    attr = 2
+class Base(Mixin):
+    pass
+''', 'ancestors_base')
+        self.assertEqual([a.name for a in klass.ancestors()], ['Base', 'Mixin'])
+        self.assertEqual([a.name for a in klass.local_attr_ancestors('attr')],
+                         ['Mixin'])
+
     def test_type(self):
         klass = MODULE['YOUPI']
         self.assertEqual(klass.type, 'class')
@@ -98,7 +98,8 @@ class LocalsVisitor(ASTWalker):
         methods = self.get_callbacks(node)
         if methods[0] is not None:
             methods[0](node)
-        if 'locals' in node.__dict__: # skip Instance and other proxy
+        # skip Instance and other proxy, and nodes without __dict__
+        if 'locals' in getattr(node, '__dict__', ()):
             for name, local_node in node.items():
                 self.visit(local_node)
         if methods[1] is not None:
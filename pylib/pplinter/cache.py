@@ -0,0 +1,127 @@
+import logging
+import os
+import threading
+import time
+
+from collections import OrderedDict
+
+
+LOG = logging.getLogger('perfectpython')
+#LOG.setLevel(logging.DEBUG)
+
+
+def get_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class ResultCache(object):
+    """
+    A bounded LRU cache of checker results. Keys are built by the checkers
+    from a hash of the text and the preferences that affect their output,
+    so changing a preference causes misses rather than stale results.
+
+    Results are stored with the modification times of the configuration
+    files they were built with. Every result is forgotten once one of these
+    files, or the preferences of a checker, change. Results may also be
+    given a lifetime, for checkers whose output depends on other files too.
+
+    """
+
+    def __init__(self, size=100):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+        self._options = {}
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._results
+
+    def is_fresh(self, key):
+        """
+        Tell whether get() would return results for key, without counting
+        a hit or a miss or forgetting anything.
+
+        """
+        with self._lock:
+            try:
+                results, config_mtimes, expires = self._results[key]
+            except KeyError:
+                return False
+        return not self._is_stale(config_mtimes, expires)
+
+    @staticmethod
+    def _is_stale(config_mtimes, expires):
+        if expires is not None and time.time() > expires:
+            return True
+        return any(
+            get_mtime(path) != mtime
+            for path, mtime in config_mtimes.items()
+        )
+
+    def get(self, key):
+        with self._lock:
+            try:
+                results, config_mtimes, expires = self._results.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            if expires is not None and time.time() > expires:
+                self.misses += 1
+                return None
+            changed = self._is_stale(config_mtimes, None)
+            if not changed:
+                self._results[key] = results, config_mtimes, expires
+                self.hits += 1
+                return results
+            self.misses += 1
+        self.clear()
+        return None
+
+    def put(self, key, results, config_mtimes=None, max_age=None):
+        """
+        Store results built with configuration files holding the given
+        modification times, by path. They are forgotten after max_age
+        seconds if given.
+
+        """
+        expires = time.time() + max_age if max_age else None
+        with self._lock:
+            self._results.pop(key, None)
+            self._results[key] = results, dict(config_mtimes or {}), expires
+            while len(self._results) > self.size:
+                self._results.popitem(last=False)
+
+    def check_options(self, owner, options):
+        """
+        Forget every result if a checker's preferences for a document, the
+        owner, changed since it last used them.
+
+        """
+        with self._lock:
+            changed = self._options.get(owner, options) != options
+            self._options[owner] = options
+        if changed:
+            self.clear()
+
+    def clear(self):
+        """Forget every result, for example after a config file changed."""
+        with self._lock:
+            self._results.clear()
+        LOG.debug('Cleared lint result cache')
+
+    @property
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._results),
+        }
+
+
+RESULTS = ResultCache()
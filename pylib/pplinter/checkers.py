@@ -4,10 +4,16 @@ import os
 import process
 import re
 import sys
+import tempfile
 import StringIO
 
 from koLintResult import KoLintResult, SEV_ERROR, SEV_WARNING
+from pplinter.cache import RESULTS, get_mtime
+from pplinter.pool import POOL, WorkerError
+from pplinter.worker import encode_buffers
 from pplinter.preferences import PrefSet
+from pplinter.runner import Cancellation, LintCancelled
+from pplinter.stats import STATS
 
 
 LOG = logging.getLogger('perfectpython')
@@ -18,19 +24,64 @@ class Checker(object):
 
     column_offset = 0
     label = ''
-    parse_pattern = None
     pref_scope = None
 
-    def __init__(self, request, path, text_lines, python=None):
+    # Slow checkers may have their results published after the others.
+    slow = False
+
+    # Seconds before cached results are checked again, for checkers whose
+    # results depend on more than the text, its preferences and config files.
+    cache_max_age = None
+
+    def __init__(self, request, session, python=None, cancellation=None):
         self.request = request
-        self.path = path
-        self.text = text_lines
+        self.session = session
+        self.path = session.path
+        self.text = session.lines
         self.python = python
+        self.cancellation = cancellation or Cancellation()
+        # The modification times of the config files read by problems().
+        self.config_mtimes = {}
+
+    @property
+    def source(self):
+        return self.session.source
 
     def add_to_results(self, results):
+        for result in self.collect_results():
+            results.addResult(result)
+
+    def collect_results(self):
+        if self.cancellation.cancelled:
+            raise LintCancelled()
         if self.preferences.get_boolean('enabled'):
-            for result in self.results():
-                results.addResult(result)
+            with STATS.timer(self.label, 'backend'):
+                problems = list(self.problems())
+            with STATS.timer(self.label, 'results'):
+                results = list(self.results(problems))
+            STATS.count(self.label, 'results', len(results))
+            RESULTS.put(self.cache_key, results, self.config_mtimes, self.cache_max_age)
+            return results
+        return []
+
+    def cached_results(self):
+        """Return the results of linting the same text before, or None."""
+        RESULTS.check_options(self.cache_key[:2], self.cache_key[3:])
+        return RESULTS.get(self.cache_key)
+
+    @property
+    def cache_key(self):
+        if not hasattr(self, '_cache_key'):
+            self._cache_key = (
+                self.__class__.__name__,
+                self.path,
+                self.session.digest,
+            ) + self.get_cache_options()
+        return self._cache_key
+
+    def get_cache_options(self):
+        """Return the preferences which change this checker's results."""
+        return ()
 
     def format_message(self, problem):
         return ' '.join(part for part in (
@@ -43,17 +94,13 @@ class Checker(object):
     def get_severity(problem):
         raise NotImplementedError()
 
-    @property
-    def output(self):
-        raise NotImplementedError()
+    def problems(self):
+        """
+        Run the checker and return its problems as dictionaries with line,
+        column, code and description keys. Only line is required.
 
-    def parsed(self):
-        for line in self.output.splitlines():
-            match = self.parse_pattern.match(line)
-            if match:
-                yield match.groupdict()
-            else:
-                LOG.debug('UNMATCHED: %s' % line)
+        """
+        raise NotImplementedError()
 
     @property
     def preferences(self):
@@ -61,9 +108,19 @@ class Checker(object):
             self._preferences = PrefSet(self.request, self.pref_scope)
         return self._preferences
 
-    def results(self):
+    def prepare(self):
+        """
+        Read every preference this checker needs and return whether it is
+        enabled. This runs on the linting thread, before the checker itself
+        runs in a thread of its own, so that Komodo's preferences are only
+        used from the thread that made the request.
+
+        """
+        return self.preferences.get_boolean('enabled')
+
+    def results(self, problems):
 
-        for problem in self.parsed():
+        for problem in problems:
 
             line = int(problem['line'])
             column = int(problem.get('column', 1)) + self.column_offset
@@ -88,12 +145,6 @@ class Checker(object):
 class Pep8Checker(Checker):
 
     label = 'PEP8'
-    parse_pattern = re.compile(r'^.+?:%s:%s:\s*%s\s*%s$' % (
-        '(?P<line>\d+)',
-        '(?P<column>\d+)',
-        '(?P<code>[A-Z]\d+)',
-        '(?P<description>.+)',
-    ))
     pref_scope = 'pep8'
 
     def get_ignored_ids(self):
@@ -115,38 +166,31 @@ class Pep8Checker(Checker):
             self._max_line_length = number
         return self._max_line_length
 
-    @property
-    def output(self):
+    def get_cache_options(self):
+        return (self.max_line_length,)
 
-        stdout, sys.stdout = sys.stdout, StringIO.StringIO()
-        try:
+    def prepare(self):
+        # Read the preference here, on the linting thread, and keep it.
+        self._max_line_length = self.max_line_length
+        return super(Pep8Checker, self).prepare()
 
-            import pep8
-            pep8.MAX_LINE_LENGTH = self.max_line_length or 79
-
-            pep8style = pep8.StyleGuide(parse_argv=False, config_file=True)
-            options = pep8style.options
-            ignored = self.get_ignored_ids()
-            if ignored is not None:
-                options.ignore.append(ignored)
-            if options.doctest or options.testsuite:
-                from testsuite.support import run_tests
-                report = run_tests(pep8style)
-            else:
-                report = pep8style.input_file(self.path)
-            if options.testsuite and not options.quiet:
-                report.print_results()
+    def problems(self):
 
-            return sys.stdout.getvalue().strip()
+        import pep8
+        from pplinter.styleguides import check_session
 
-        finally:
-            sys.stdout = stdout
+        self.config_mtimes = {pep8.DEFAULT_CONFIG: get_mtime(pep8.DEFAULT_CONFIG)}
+        ignored = self.get_ignored_ids()
+        return check_session(
+            self.session,
+            max_line_length=self.max_line_length or pep8.MAX_LINE_LENGTH,
+            ignored=ignored and (ignored,) or (),
+        )
 
 
 class PyflakesChecker(Checker):
 
     label = 'Pyflakes'
-    parse_pattern = re.compile(r'^.+?:(?P<line>\d+):\s*(?P<description>.+)$')
     pref_scope = 'pyflakes'
 
     def format_message(self, problem):
@@ -167,32 +211,20 @@ class PyflakesChecker(Checker):
         else:
             return SEV_ERROR
 
-    @property
-    def output(self):
-
-        stderr, sys.stderr = sys.stderr, StringIO.StringIO()
-        stdout, sys.stdout = sys.stdout, StringIO.StringIO()
-        try:
-
-            from pyflakes.scripts import pyflakes
-            pyflakes.checkPath(self.path)
+    def problems(self):
 
-            errors = sys.stderr.getvalue().strip()
-            if errors:
-                return errors
-            else:
-                output = sys.stdout.getvalue().strip()
-                return output
+        from pplinter.reporters import PyflakesReporter
 
-        finally:
-            sys.stderr = stderr
-            sys.stdout = stdout
+        reporter = PyflakesReporter()
+        reporter.check_session(self.session)
+        return reporter.problems
 
 
 class PylintChecker(Checker):
 
     label = 'Pylint'
     column_offset = 1
+    slow = True
     parse_pattern = re.compile(r'^%s:\s*%s,%s:(\s*%s:)?\s*%s' % (
         '(?P<code>[A-Z]\d+)',
         '(?P<line>\d+)',
@@ -202,6 +234,13 @@ class PylintChecker(Checker):
     ))
     pref_scope = 'pylint'
 
+    # Pylint also reads the modules imported by the text, which may change
+    # without changing anything in the cache key.
+    cache_max_age = 60
+
+    # The linter's deadline, read by prepare().
+    deadline = None
+
     pylint_config_warning = 'No config file found, using default configuration\n'
     pylint_python_code = '''
 import os
@@ -226,6 +265,24 @@ Run(sys.argv[1:])
     def get_ignored_ids(self):
         return self.preferences.get_string('ignoredIds')
 
+    def get_extra_paths(self):
+        return self.preferences.get_string('pythonExtraPaths', scope='') or ''
+
+    def get_cache_options(self):
+        return (
+            self.get_ignored_ids(),
+            self.get_extra_paths(),
+            self.python,
+            self.request.cwd,
+        )
+
+    def prepare(self):
+        self.get_ignored_ids()
+        self.get_extra_paths()
+        # A worker which takes longer than this may have hung.
+        self.deadline = PrefSet(self.request, 'linter').get_float('deadline')
+        return super(PylintChecker, self).prepare()
+
     @staticmethod
     def get_severity(problem):
         code = problem['code']
@@ -235,17 +292,16 @@ Run(sys.argv[1:])
         else:
             return SEV_WARNING
 
-    @property
-    def output(self):
+    def get_options(self, path):
 
         options = []
         options.extend(('--disable', self.get_ignored_ids()))
         options.extend(('--include-ids', 'y'))
         options.extend(('--good-names', '_,db'))
 
-        # Don't complain about the temp filename.
+        # Don't complain about the filename, which may be a temp file.
         options.extend(('--module-rgx', self.combine_regexes(
-            os.path.splitext(os.path.basename(self.path))[0],
+            os.path.splitext(os.path.basename(path))[0],
             '[a-z_][a-z0-9_]*',
             '[A-Z][a-zA-Z0-9]+',
         )))
@@ -259,19 +315,109 @@ Run(sys.argv[1:])
         )))
 
         options.extend(('--reports', 'n'))
-        options.append(self.path)
+        options.append(path)
+
+        return options
 
+    def problems(self):
         if self.python:
-            return self.run_externally(options)
+            return self.run_externally()
         else:
-            return self.run_internally(options)
+            return self.parse(self.run_with_temp_file(self.run_internally))
+
+    def parse(self, output):
+        """Parse the text output of a pylint process that ran outside the pool."""
+        problems = []
+        with STATS.timer(self.label, 'parse'):
+            for line in output.splitlines():
+                match = self.parse_pattern.match(line)
+                if match:
+                    problems.append(match.groupdict())
+                else:
+                    LOG.debug('UNMATCHED: %s' % line)
+        return problems
+
+    def run_with_temp_file(self, runner):
+        """
+        Pylint can only check files on disk when it runs outside of a worker,
+        so save the text to a temporary file and check that instead.
+
+        """
+
+        temp_file = tempfile.NamedTemporaryFile(
+            mode='w',
+            suffix='.py',
+            delete=False,
+        )
+
+        try:
+
+            with STATS.timer(self.label, 'temp file'):
+                temp_file.write(self.source)
+                temp_file.close()
 
-    def run_externally(self, options):
+            return runner(self.get_options(temp_file.name))
+
+        finally:
+            os.unlink(temp_file.name)
+
+    def log_errors(self, command, environment, stdout, stderr):
+        if stderr != self.pylint_config_warning:
+            LOG.critical('Error running pylint script: %s' % stderr)
+            LOG.warn('Command: %s' % command)
+            LOG.warn('Environment: %s' % environment)
+            LOG.warn('Standard Output: %s' % stdout)
+
+    def log_worker_errors(self, job, stderr):
+        if stderr and stderr != self.pylint_config_warning:
+            LOG.critical('Error running pylint worker: %s' % stderr)
+            LOG.warn('Python: %s' % self.python)
+            LOG.warn('Options: %s' % job['options'])
+            LOG.warn('Working directory: %s' % job['cwd'])
+
+    def run_externally(self):
+        """Run pylint in a warm worker process for the user's python."""
+
+        options = self.get_options(self.path)
+
+        extra_paths = self.get_extra_paths()
+        job = {
+            'buffers': encode_buffers({self.path: self.source}),
+            'cwd': self.request.cwd,
+            'options': options,
+            'paths_before': extra_paths.split(os.pathsep),
+            'paths_after': sys.path,
+        }
+
+        try:
+            messages, stderr, self.config_mtimes = POOL.run(
+                self.python, job, self.cancellation, self.deadline)
+        except WorkerError:
+            if self.cancellation.cancelled:
+                raise LintCancelled()
+            LOG.exception('Error running pylint worker, falling back to a new process')
+            return self.parse(self.run_with_temp_file(self.run_in_new_process))
+
+        self.log_worker_errors(job, stderr)
+        # Some messages quote the offending source on extra lines, which the
+        # editor already shows.
+        return [
+            {
+                'code': msg_id,
+                'line': line,
+                'column': column,
+                'location': obj,
+                'description': msg.split('\n', 1)[0],
+            }
+            for msg_id, line, column, obj, msg in messages
+        ]
+
+    def run_in_new_process(self, options):
 
         command = [self.python, '-c', self.pylint_python_code]
 
         environment = koprocessutils.getUserEnv()
-        environment['KOMODO_PATHS_BEFORE'] = self.preferences.get_string('pythonExtraPaths', scope='')
+        environment['KOMODO_PATHS_BEFORE'] = self.get_extra_paths()
         environment['KOMODO_PATHS_AFTER'] = os.pathsep.join(sys.path)
 
         pylint_process = process.ProcessOpen(
@@ -280,12 +426,14 @@ Run(sys.argv[1:])
             env=environment,
             stdin=None,
         )
-        stdout, stderr = pylint_process.communicate()
-        if stderr != self.pylint_config_warning:
-            LOG.critical('Error running pylint script: %s' % stderr)
-            LOG.warn('Command: %s' % command)
-            LOG.warn('Environment: %s' % environment)
-            LOG.warn('Standard Output: %s' % stdout)
+        remove_callback = self.cancellation.on_cancel(pylint_process.kill)
+        try:
+            stdout, stderr = pylint_process.communicate()
+        finally:
+            remove_callback()
+        if self.cancellation.cancelled:
+            raise LintCancelled()
+        self.log_errors(command, environment, stdout, stderr)
         return stdout.strip()
 
     @staticmethod
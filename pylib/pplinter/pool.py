@@ -0,0 +1,253 @@
+import json
+import logging
+import os
+import process
+import subprocess
+import threading
+import time
+import Queue
+
+import koprocessutils
+
+
+LOG = logging.getLogger('perfectpython')
+#LOG.setLevel(logging.DEBUG)
+
+
+class WorkerError(Exception):
+    pass
+
+
+class WorkerTimeout(WorkerError):
+    """Raised when a worker doesn't reply in time, which kills it."""
+
+
+class PylintWorker(object):
+    """A pylint process that stays running between lint requests."""
+
+    bootstrap_code = '''
+import os
+import sys
+sys.path.append(os.environ["PERFECTPYTHON_PYLIB"])
+from pplinter.worker import main
+main()
+'''
+
+    def __init__(self, python):
+        self.python = python
+        self.jobs = 0
+        self.rss = None
+        self._stopped = False
+        environment = koprocessutils.getUserEnv()
+        environment['PERFECTPYTHON_PYLIB'] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self._process = process.ProcessOpen(
+            cmd=[python, '-c', self.bootstrap_code],
+            env=environment,
+            stdin=subprocess.PIPE,
+        )
+        # Replies are read by a thread of their own, so that waiting for
+        # one can time out on every platform.
+        self._replies = Queue.Queue()
+        self._reader = threading.Thread(target=self._read_replies, name='perfectpython-pylint-worker')
+        self._reader.daemon = True
+        self._reader.start()
+
+    @property
+    def alive(self):
+        return not self._stopped and self._process.poll() is None
+
+    def _read_replies(self):
+        try:
+            for line in iter(self._process.stdout.readline, ''):
+                self._replies.put(line)
+        except (IOError, OSError, ValueError):
+            # ValueError: the pipes were closed by stop()
+            pass
+        self._replies.put('')
+
+    def run(self, job, timeout=None):
+        """
+        Send a job and return its reply. A worker which doesn't reply within
+        timeout seconds is presumed hung: it is killed and WorkerTimeout is
+        raised.
+
+        """
+        try:
+            self._process.stdin.write(json.dumps(job) + '\n')
+            self._process.stdin.flush()
+        except (IOError, OSError, ValueError), error:
+            # ValueError: the pipes were closed by stop()
+            self.stop()
+            raise WorkerError('Pylint worker pipe failed: %s' % error)
+        try:
+            line = self._replies.get(timeout=timeout)
+        except Queue.Empty:
+            self.stop()
+            raise WorkerTimeout('Pylint worker did not reply within %s seconds' % timeout)
+        if not line:
+            self.stop()
+            raise WorkerError('Pylint worker exited: %s' % self._process.stderr.read())
+        try:
+            reply = json.loads(line)
+        except ValueError:
+            self.stop()
+            raise WorkerError('Pylint worker sent an invalid reply: %r' % line)
+        self.jobs += 1
+        self.rss = reply.get('rss')
+        if 'error' in reply:
+            raise WorkerError(reply['error'])
+        return reply['messages'], reply['errors'], reply['config_files']
+
+    def stop(self):
+        self._stopped = True
+        try:
+            self._process.stdin.close()
+            if self._process.poll() is None:
+                self._process.kill()
+        except Exception:
+            LOG.exception('Error stopping pylint worker')
+
+
+class PylintWorkerPool(object):
+    """
+    Pylint workers grouped by the python executable that runs them.
+
+    A worker is replaced when it crashes, after it has grown beyond
+    memory_limit kilobytes, or after it has handled max_jobs jobs.
+
+    """
+
+    max_jobs = 500
+    memory_limit = 512 * 1024
+    size = 2
+    acquire_timeout = 60
+
+    # The least number of seconds to wait for a reply before killing a
+    # worker, so that a slow but healthy pylint can still finish and cache
+    # its results after the lint deadline.
+    min_reply_timeout = 30
+
+    def __init__(self):
+        self._idle = {}
+        self._busy = {}
+        self._condition = threading.Condition()
+
+    def run(self, python, job, cancellation=None, deadline=None):
+        """
+        Run a pylint job and return its messages, its errors and the
+        modification times of the configuration files it used. A job which
+        fails because its worker died is retried once with a new worker.
+
+        A worker which takes longer than the lint deadline, or than
+        min_reply_timeout seconds if that is longer, is killed and replaced.
+        Its job raises WorkerTimeout and is not retried.
+
+        A cancelled job raises WorkerError. It stops waiting for a worker
+        if it is still queued. Otherwise it is left to finish, since pylint
+        can't be interrupted and killing the worker would throw away the
+        modules it has loaded, and its results are dropped.
+
+        """
+        timeout = max(deadline or 0, self.min_reply_timeout)
+        for attempt in (1, 2):
+            worker = self.acquire(python, cancellation)
+            try:
+                try:
+                    result = worker.run(job, timeout)
+                except WorkerTimeout:
+                    LOG.warn('Killed pylint worker for %s after %s seconds' % (python, timeout))
+                    raise
+                except WorkerError:
+                    crashed = not worker.alive
+                    if attempt == 2 or not crashed or cancellation and cancellation.cancelled:
+                        raise
+                    LOG.warn('Restarting pylint worker for %s' % python)
+                else:
+                    if cancellation is not None and cancellation.cancelled:
+                        raise WorkerError('Pylint job cancelled')
+                    return result
+            finally:
+                self.release(worker)
+
+    def acquire(self, python, cancellation=None):
+        """
+        Return an idle worker for python, or a new one if fewer than size
+        workers are busy. Raise WorkerError if the cancellation is cancelled
+        first, or if no worker is released within acquire_timeout seconds.
+
+        """
+        end_time = time.time() + self.acquire_timeout
+        if cancellation is None:
+            remove_callback = lambda: None
+        else:
+            remove_callback = cancellation.on_cancel(self._wake_up)
+        self._condition.acquire()
+        try:
+            while True:
+                if cancellation is not None and cancellation.cancelled:
+                    raise WorkerError('Pylint job cancelled')
+                idle = self._idle.setdefault(python, [])
+                busy = self._busy.setdefault(python, 0)
+                if idle:
+                    worker = idle.pop()
+                    break
+                if busy < self.size:
+                    worker = None
+                    break
+                remaining = end_time - time.time()
+                if remaining <= 0:
+                    raise WorkerError('No pylint worker for %s was released within %s seconds'
+                                      % (python, self.acquire_timeout))
+                self._condition.wait(remaining)
+            self._busy[python] = busy + 1
+        finally:
+            self._condition.release()
+            remove_callback()
+        if worker is None:
+            try:
+                worker = PylintWorker(python)
+            except Exception:
+                self.release(None, python)
+                raise
+        return worker
+
+    def _wake_up(self):
+        """Let the jobs waiting for a worker check their cancellation."""
+        self._condition.acquire()
+        try:
+            self._condition.notify_all()
+        finally:
+            self._condition.release()
+
+    def release(self, worker, python=None):
+        retire = worker is not None and (
+            not worker.alive or
+            worker.jobs >= self.max_jobs or
+            worker.rss is not None and worker.rss > self.memory_limit
+        )
+        if retire:
+            LOG.debug('Retiring pylint worker after %s jobs using %s KB' % (worker.jobs, worker.rss))
+            worker.stop()
+        self._condition.acquire()
+        try:
+            python = python or worker.python
+            self._busy[python] -= 1
+            if worker is not None and not retire:
+                self._idle[python].append(worker)
+            # cancelled jobs may be among the waiting ones
+            self._condition.notify_all()
+        finally:
+            self._condition.release()
+
+    def shutdown(self):
+        self._condition.acquire()
+        try:
+            for workers in self._idle.values():
+                for worker in workers:
+                    worker.stop()
+            self._idle.clear()
+        finally:
+            self._condition.release()
+
+
+POOL = PylintWorkerPool()
@@ -15,10 +15,20 @@ SCOPE = 'pplint-0-6-5'
 
 DEFAULTS = {
     SCOPE: {
+        'linter': {
+            # Seconds to wait for all checkers before returning the results
+            # of those that have finished.
+            'deadline': '10',
+            # Publish the fast checkers' results first and the slow
+            # checkers' results in a second update.
+            'streaming': True,
+            # Log latency percentiles for each checker after every lint.
+            'debugTimings': False,
+        },
         'pep8': {
             'enabled': True,
             'maxLineLength': '120',
-        }
+        },
     }
 }
 
@@ -31,8 +41,18 @@ class PrefSet(object):
         else:
             self.prefset = getProxiedEffectivePrefs(request)
         self.scope = scope
+        self._values = {}
 
-    def _get_preference(self, getter, name, scope):
+    def _get_preference(self, getter_name, name, scope):
+        # Values are cached so that a checker can read its preferences on
+        # the linting thread, then use them again from its own thread.
+        key = (getter_name, name, scope)
+        if key not in self._values:
+            getter = getattr(self.prefset, getter_name)
+            self._values[key] = self._read_preference(getter, name, scope)
+        return self._values[key]
+
+    def _read_preference(self, getter, name, scope):
 
         if scope is None:
             full_name = '.'.join((SCOPE, self.scope, name))
@@ -62,9 +82,13 @@ class PrefSet(object):
             raise
 
     def get_boolean(self, name, scope=None):
-        getter = self.prefset.getBooleanPref
-        return self._get_preference(getter, name, scope)
+        return self._get_preference('getBooleanPref', name, scope)
 
     def get_string(self, name, scope=None):
-        getter = self.prefset.getStringPref
-        return self._get_preference(getter, name, scope)
+        return self._get_preference('getStringPref', name, scope)
+
+    def get_float(self, name, scope=None, default=None):
+        try:
+            return float(self.get_string(name, scope))
+        except (TypeError, ValueError):
+            return default
@@ -0,0 +1,90 @@
+"""
+Reporters which collect each checker's problems as records, so that they
+don't have to be formatted as text and parsed again. They also let checkers
+run in threads without redirecting sys.stdout and sys.stderr.
+
+"""
+
+import _ast
+import logging
+
+import pep8
+from pyflakes.checker import Checker
+from pyflakes.reporter import Reporter
+
+
+LOG = logging.getLogger('perfectpython')
+#LOG.setLevel(logging.DEBUG)
+
+
+class Pep8Report(pep8.BaseReport):
+    """A pep8 report which collects problems instead of printing them."""
+
+    def __init__(self, options):
+        super(Pep8Report, self).__init__(options)
+        self._repeat = options.repeat
+
+    def init_file(self, filename, lines, expected, line_offset):
+        self.problems = []
+        return super(Pep8Report, self).init_file(filename, lines, expected, line_offset)
+
+    def error(self, line_number, offset, text, check):
+        code = super(Pep8Report, self).error(line_number, offset, text, check)
+        # As pep8.StandardReport does, only keep the first problem of each
+        # code unless the repeat option (first = false) is set.
+        if code and (self.counters[code] == 1 or self._repeat):
+            self.problems.append({
+                'code': code,
+                'line': self.line_offset + line_number,
+                'column': offset + 1,
+                'description': text[5:],
+            })
+        return code
+
+    def get_file_results(self):
+        self.problems.sort(key=lambda problem: (problem['line'], problem['column']))
+        return self.file_errors
+
+
+class PyflakesReporter(Reporter):
+    """A pyflakes reporter which collects problems instead of printing them."""
+
+    def __init__(self):
+        self.problems = []
+
+    def check_session(self, session):
+        """
+        Check the text of a lint session, handling errors the same way as
+        pyflakes.api.check does.
+
+        """
+        try:
+            tree = compile(session.source + '\n', session.path, 'exec', _ast.PyCF_ONLY_AST)
+        except SyntaxError, error:
+            if error.text is None:
+                self.unexpectedError(session.path, 'problem decoding source')
+            else:
+                self.syntaxError(session.path, error.args[0], error.lineno, error.offset, error.text)
+        except Exception:
+            self.unexpectedError(session.path, 'problem decoding source')
+        else:
+            checker = Checker(tree, session.path)
+            checker.messages.sort(key=lambda message: message.lineno)
+            for message in checker.messages:
+                self.flake(message)
+
+    def unexpectedError(self, filename, msg):
+        LOG.warn('Pyflakes could not check %s: %s' % (filename, msg))
+
+    def syntaxError(self, filename, msg, lineno, offset, text):
+        self.problems.append({
+            'line': lineno,
+            'description': msg,
+        })
+
+    def flake(self, message):
+        self.problems.append({
+            'line': message.lineno,
+            'description': message.message % message.message_args,
+        })
+
@@ -0,0 +1,143 @@
+import logging
+import threading
+import time
+
+from pplinter.cache import RESULTS
+from pplinter.stats import STATS
+
+
+LOG = logging.getLogger('perfectpython')
+#LOG.setLevel(logging.DEBUG)
+
+
+class LintCancelled(Exception):
+    """Raised by a checker whose request was superseded by a newer one."""
+
+
+class Cancellation(object):
+    """
+    Lets a newer lint request for a document stop the work that is still
+    running for an older one. Checkers register callbacks which stop their
+    work, such as killing a pylint process.
+
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                LOG.exception('Error cancelling lint request')
+
+    def on_cancel(self, callback):
+        """
+        Call the callback when this is cancelled, or now if it already
+        has been. Return a function which unregisters the callback.
+
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove(callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+class CheckerThread(threading.Thread):
+
+    def __init__(self, checker):
+        threading.Thread.__init__(self, name='perfectpython-%s' % checker.label)
+        # Don't keep Komodo running for a checker that missed its deadline.
+        self.daemon = True
+        self.checker = checker
+        self.results = []
+
+    def run(self):
+        try:
+            self.results = self.checker.collect_results()
+        except LintCancelled:
+            STATS.count(self.checker.label, 'cancelled')
+            LOG.debug('%s was cancelled' % self.checker.__class__.__name__)
+        except Exception:
+            LOG.exception('Error running %s' % self.checker.__class__.__name__)
+
+
+def run_checkers(checkers, deadline):
+    """
+    Run the checkers at the same time, each in its own thread, and return
+    the results of those that finish within the deadline (in seconds) in
+    the same order as the checkers. Checkers that are still running are
+    left to finish in the background; their results are discarded but
+    still cached for the next request.
+
+    Checkers which have already linted the same text return their cached
+    results without starting a thread.
+
+    """
+
+    pending = []
+    for checker in checkers:
+        cached = checker.cached_results()
+        if cached is None:
+            thread = CheckerThread(checker)
+            thread.start()
+        else:
+            thread = None
+        pending.append((checker, cached, thread))
+
+    end_time = time.time() + deadline
+    results = []
+    for checker, cached, thread in pending:
+        if thread is None:
+            STATS.count(checker.label, 'cached')
+            results.extend(cached)
+            continue
+        thread.join(max(0, end_time - time.time()))
+        if checker.cancellation.cancelled:
+            continue
+        if thread.is_alive():
+            STATS.count(checker.label, 'timeouts')
+            LOG.warn('%s did not finish within %s seconds' % (checker.__class__.__name__, deadline))
+        else:
+            results.extend(thread.results)
+
+    LOG.debug('Lint result cache: %(hits)s hits, %(misses)s misses, %(size)s entries' % RESULTS.stats)
+    return results
+
+
+def run_checkers_later(checkers, deadline, callback):
+    """
+    Run the checkers in a background thread, then call the callback with
+    their results.
+
+    """
+
+    def run():
+        try:
+            callback(run_checkers(checkers, deadline))
+        except Exception:
+            LOG.exception('Error publishing delayed results')
+
+    thread = threading.Thread(target=run, name='perfectpython-delayed')
+    thread.daemon = True
+    thread.start()
+    return thread
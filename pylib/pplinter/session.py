@@ -0,0 +1,16 @@
+import hashlib
+
+
+class LintSession(object):
+    """
+    The text of a single lint request, shared by every checker that runs
+    for it. The text is joined and hashed once, for the checkers' result
+    cache keys.
+
+    """
+
+    def __init__(self, path, text_lines):
+        self.path = path
+        self.lines = text_lines
+        self.source = ''.join(text_lines)
+        self.digest = hashlib.sha1(self.source).hexdigest()
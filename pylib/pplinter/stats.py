@@ -0,0 +1,87 @@
+import logging
+import threading
+import time
+
+from collections import deque
+from contextlib import contextmanager
+
+
+LOG = logging.getLogger('perfectpython')
+#LOG.setLevel(logging.DEBUG)
+
+
+class Histogram(object):
+    """The most recent samples of a measurement."""
+
+    def __init__(self, size=200):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+
+    def percentile(self, percent):
+        if not self.samples:
+            return None
+        samples = sorted(self.samples)
+        index = int(round(percent / 100.0 * (len(samples) - 1)))
+        return samples[index]
+
+
+class LintStats(object):
+    """
+    Rolling latency histograms for each phase of each checker, and running
+    totals of things like results and timeouts. Enable the linter's
+    debugTimings preference to log a summary after every lint.
+
+    """
+
+    percentiles = (50, 95, 99)
+
+    def __init__(self, size=200):
+        self.size = size
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counts = {}
+
+    def add(self, checker, phase, seconds):
+        with self._lock:
+            key = (checker, phase)
+            if key not in self._histograms:
+                self._histograms[key] = Histogram(self.size)
+            self._histograms[key].add(seconds)
+
+    def count(self, checker, name, number=1):
+        with self._lock:
+            key = (checker, name)
+            self._counts[key] = self._counts.get(key, 0) + number
+
+    @contextmanager
+    def timer(self, checker, phase):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(checker, phase, time.time() - start)
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counts.clear()
+
+    def summary(self):
+        lines = []
+        with self._lock:
+            for (checker, phase), histogram in sorted(self._histograms.items()):
+                timings = ' '.join(
+                    'p%s=%.1fms' % (percent, histogram.percentile(percent) * 1000)
+                    for percent in self.percentiles
+                )
+                lines.append('%s %s: %s (%s runs)' % (checker, phase, timings, histogram.count))
+            for (checker, name), number in sorted(self._counts.items()):
+                lines.append('%s %s: %s' % (checker, name, number))
+        return '\n'.join(lines)
+
+
+STATS = LintStats()
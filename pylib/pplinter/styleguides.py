@@ -0,0 +1,74 @@
+"""
+Building a pep8 StyleGuide parses options, reads the user's configuration
+file and sorts pep8's registry of checks, which takes longer than checking
+a small file. Style guides are built once for each combination of options
+and reused until the configuration file changes.
+
+"""
+
+import logging
+import threading
+
+import pep8
+
+from pplinter.cache import get_mtime
+from pplinter.reporters import Pep8Report
+
+
+LOG = logging.getLogger('perfectpython')
+#LOG.setLevel(logging.DEBUG)
+
+
+_style_guides = {}
+_lock = threading.Lock()
+
+
+def build_style_guide(max_line_length, ignored):
+    """
+    Build a style guide without changing any of pep8's global settings.
+    The max line length is used as a default, so the user's configuration
+    file can still override it.
+
+    """
+
+    parser = pep8.get_parser()
+    parser.set_defaults(max_line_length=max_line_length)
+    style_guide = pep8.StyleGuide(parse_argv=False, config_file=True, parser=parser)
+
+    options = style_guide.options
+    if ignored:
+        options.ignore = tuple(options.ignore) + tuple(ignored)
+        options.physical_checks = style_guide.get_checks('physical_line')
+        options.logical_checks = style_guide.get_checks('logical_line')
+        options.ast_checks = style_guide.get_checks('tree')
+
+    return style_guide
+
+
+def get_style_guide(max_line_length=pep8.MAX_LINE_LENGTH, ignored=()):
+    key = (max_line_length, tuple(ignored), get_mtime(pep8.DEFAULT_CONFIG))
+    with _lock:
+        style_guide = _style_guides.get(key)
+        if style_guide is None:
+            LOG.debug('Building pep8 style guide for %s' % (key,))
+            # Forget style guides which used an older configuration file.
+            for old_key in list(_style_guides):
+                if old_key[2] != key[2]:
+                    del _style_guides[old_key]
+            style_guide = _style_guides[key] = build_style_guide(max_line_length, ignored)
+    return style_guide
+
+
+def check_session(session, max_line_length=pep8.MAX_LINE_LENGTH, ignored=()):
+    """
+    Check the text of a lint session with a cached style guide and return
+    the problems found. Each call gets its own report, so that checks can
+    run in several threads at once.
+
+    """
+
+    style_guide = get_style_guide(max_line_length, ignored)
+    report = Pep8Report(style_guide.options)
+    checker = pep8.Checker(session.path, lines=session.lines, options=style_guide.options, report=report)
+    checker.check_all()
+    return report.problems
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pplinter.cache import ResultCache
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.directory, 'pylintrc')
+        self.write_config(1000)
+        self.cache = ResultCache(size=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_config(self, mtime):
+        with open(self.config_file, 'w') as config_file:
+            config_file.write('[MESSAGES CONTROL]\n')
+        os.utime(self.config_file, (mtime, mtime))
+
+    def test_hit(self):
+        self.cache.put('a', ['result'], {self.config_file: 1000})
+        self.assertEqual(self.cache.get('a'), ['result'])
+        self.assertEqual(self.cache.stats, {'hits': 1, 'misses': 0, 'size': 1})
+
+    def test_config_changed(self):
+        self.cache.put('a', ['result'], {self.config_file: 1000})
+        self.cache.put('b', ['other result'])
+        self.write_config(2000)
+        self.assertEqual(self.cache.get('a'), None)
+        # Every result is forgotten, not only those built with the file.
+        self.assertFalse('b' in self.cache)
+
+    def test_config_removed(self):
+        self.cache.put('a', ['result'], {self.config_file: 1000})
+        os.remove(self.config_file)
+        self.assertEqual(self.cache.get('a'), None)
+
+    def test_config_created(self):
+        missing = os.path.join(self.directory, 'setup.cfg')
+        self.cache.put('a', ['result'], {missing: None})
+        self.assertEqual(self.cache.get('a'), ['result'])
+        with open(missing, 'w'):
+            pass
+        self.assertEqual(self.cache.get('a'), None)
+
+    def test_options_changed(self):
+        self.cache.check_options('document', ('E501',))
+        self.cache.put('a', ['result'])
+        self.cache.check_options('document', ('E501',))
+        self.assertTrue('a' in self.cache)
+        self.cache.check_options('document', ())
+        self.assertFalse('a' in self.cache)
+
+    def test_max_age(self):
+        self.cache.put('a', ['result'], max_age=-1)
+        self.assertEqual(self.cache.get('a'), None)
+
+    def test_is_fresh(self):
+        self.cache.put('a', ['result'], {self.config_file: 1000})
+        self.cache.put('b', ['result'], max_age=-1)
+        self.assertTrue(self.cache.is_fresh('a'))
+        self.assertFalse(self.cache.is_fresh('b'))
+        self.assertFalse(self.cache.is_fresh('c'))
+        self.write_config(2000)
+        self.assertFalse(self.cache.is_fresh('a'))
+        # Nothing was counted or forgotten.
+        self.assertEqual(self.cache.stats, {'hits': 0, 'misses': 0, 'size': 2})
+
+    def test_size(self):
+        self.cache.put('a', ['a'])
+        self.cache.put('b', ['b'])
+        self.cache.get('a')
+        self.cache.put('c', ['c'])
+        self.assertTrue('a' in self.cache)
+        self.assertFalse('b' in self.cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
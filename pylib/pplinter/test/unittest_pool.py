@@ -0,0 +1,176 @@
+import json
+import sys
+import threading
+import time
+import types
+import unittest
+import StringIO
+
+
+class FakeProcess(object):
+    """
+    A worker process which answers each job with the next of its replies.
+    A reply of None never comes: the process hangs until it is killed.
+
+    """
+
+    def __init__(self, replies, on_job=None):
+        self.stdin = self
+        self.stdout = self
+        self.stderr = StringIO.StringIO('Segmentation fault')
+        self.replies = list(replies)
+        self.on_job = on_job
+        self.returncode = None
+        self.killed = False
+        self._jobs = threading.Semaphore(0)
+        self._closed = threading.Event()
+
+    def write(self, data):
+        self._jobs.release()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self._closed.set()
+        self._jobs.release()
+
+    def readline(self):
+        self._jobs.acquire()
+        if self._closed.is_set():
+            return ''
+        if self.on_job is not None:
+            self.on_job()
+        if not self.replies:
+            # The process died.
+            self.returncode = -11
+            return ''
+        reply = self.replies.pop(0)
+        if reply is None:
+            self._closed.wait()
+            return ''
+        return json.dumps(reply) + '\n'
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+        self.returncode = -9
+
+
+# pplinter.pool starts its workers with Komodo's modules.
+PROCESSES = []
+process = types.ModuleType('process')
+process.ProcessOpen = lambda cmd, env, stdin: PROCESSES.pop(0)
+koprocessutils = types.ModuleType('koprocessutils')
+koprocessutils.getUserEnv = lambda: {}
+sys.modules.setdefault('process', process)
+sys.modules.setdefault('koprocessutils', koprocessutils)
+
+from pplinter.pool import PylintWorkerPool, WorkerError, WorkerTimeout
+from pplinter.runner import Cancellation
+
+
+REPLY = {'messages': [['C0111', 1, 0, '', 'Missing docstring']], 'errors': '', 'config_files': {}, 'rss': 1}
+
+
+class PylintWorkerPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = PylintWorkerPool()
+        self.pool.size = 1
+        self.pool.acquire_timeout = 5
+        PROCESSES[:] = []
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_reuses_worker(self):
+        PROCESSES.append(FakeProcess([REPLY, REPLY]))
+        self.pool.run('python', {})
+        messages, errors, config_files = self.pool.run('python', {})
+        self.assertEqual(messages, REPLY['messages'])
+        self.assertEqual(self.pool._busy['python'], 0)
+        self.assertEqual(self.pool._idle['python'][0].jobs, 2)
+
+    def test_restarts_crashed_worker(self):
+        crashed = FakeProcess([])
+        PROCESSES.extend([crashed, FakeProcess([REPLY])])
+        messages, errors, config_files = self.pool.run('python', {})
+        self.assertEqual(messages, REPLY['messages'])
+        self.assertEqual(PROCESSES, [])
+        self.assertEqual(self.pool._busy['python'], 0)
+        self.assertEqual(len(self.pool._idle['python']), 1)
+        self.assertFalse(self.pool._idle['python'][0]._process is crashed)
+
+    def test_gives_up_after_second_crash(self):
+        PROCESSES.extend([FakeProcess([]), FakeProcess([])])
+        self.assertRaises(WorkerError, self.pool.run, 'python', {})
+        self.assertEqual(self.pool._busy['python'], 0)
+        self.assertEqual(self.pool._idle['python'], [])
+
+    def test_kills_hung_worker(self):
+        self.pool.min_reply_timeout = 0.1
+        hung = FakeProcess([None])
+        PROCESSES.extend([hung, FakeProcess([REPLY])])
+        self.assertRaises(WorkerTimeout, self.pool.run, 'python', {}, None, 0.05)
+        self.assertTrue(hung.killed)
+        # The hung job isn't retried, and its slot is free again.
+        self.assertEqual(len(PROCESSES), 1)
+        self.assertEqual(self.pool._busy['python'], 0)
+        self.assertEqual(self.pool._idle['python'], [])
+        messages, errors, config_files = self.pool.run('python', {})
+        self.assertEqual(messages, REPLY['messages'])
+
+    def test_reply_timeout_follows_deadline(self):
+        self.pool.min_reply_timeout = 0.01
+        PROCESSES.append(FakeProcess([None]))
+        start = time.time()
+        self.assertRaises(WorkerTimeout, self.pool.run, 'python', {}, None, 0.2)
+        self.assertTrue(time.time() - start >= 0.2)
+
+    def test_error_reply_keeps_worker(self):
+        PROCESSES.append(FakeProcess([{'error': 'Invalid reply', 'rss': 1}, REPLY]))
+        self.assertRaises(WorkerError, self.pool.run, 'python', {})
+        messages, errors, config_files = self.pool.run('python', {})
+        self.assertEqual(messages, REPLY['messages'])
+
+    def test_cancelled_job_releases_worker(self):
+        cancellation = Cancellation()
+        fake = FakeProcess([REPLY, REPLY], on_job=cancellation.cancel)
+        PROCESSES.append(fake)
+        self.assertRaises(WorkerError, self.pool.run, 'python', {}, cancellation)
+        self.assertFalse(fake.killed)
+        self.assertEqual(self.pool._busy['python'], 0)
+        self.assertEqual(len(self.pool._idle['python']), 1)
+        # The slot is free for the next job, which uses the same worker.
+        fake.on_job = None
+        self.pool.run('python', {})
+        self.assertEqual(fake.replies, [])
+
+    def test_cancelled_queued_job(self):
+        PROCESSES.append(FakeProcess([]))
+        worker = self.pool.acquire('python')
+        cancellation = Cancellation()
+        errors = []
+
+        def run():
+            try:
+                self.pool.run('python', {}, cancellation)
+            except WorkerError, error:
+                errors.append(error)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        cancellation.cancel()
+        thread.join(self.pool.acquire_timeout)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(self.pool._busy['python'], 1)
+        self.pool.release(worker)
+        self.assertEqual(self.pool._busy['python'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+import pep8
+
+from pplinter.reporters import Pep8Report
+
+
+LINES = [
+    'x=1\n',
+    'y=2\n',
+    'z = 3\n',
+]
+
+
+class Pep8ReportTest(unittest.TestCase):
+
+    def check(self, repeat):
+        options = pep8.StyleGuide(parse_argv=False, config_file=False, repeat=repeat).options
+        report = Pep8Report(options)
+        pep8.Checker('test.py', lines=LINES, options=options, report=report).check_all()
+        return [(problem['code'], problem['line']) for problem in report.problems]
+
+    def test_repeat(self):
+        self.assertEqual(self.check(True), [('E225', 1), ('E225', 2)])
+
+    def test_first(self):
+        self.assertEqual(self.check(False), [('E225', 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import threading
+import time
+import unittest
+
+from pplinter.runner import Cancellation, LintCancelled, run_checkers
+from pplinter.stats import STATS
+
+
+class FakeChecker(object):
+
+    def __init__(self, label, results, delay=0, cached=None):
+        self.label = label
+        self.cancellation = Cancellation()
+        self._results = results
+        self._delay = delay
+        self._cached = cached
+        self.finished = threading.Event()
+
+    def cached_results(self):
+        return self._cached
+
+    def collect_results(self):
+        try:
+            if self.cancellation.cancelled:
+                raise LintCancelled()
+            time.sleep(self._delay)
+            return self._results
+        finally:
+            self.finished.set()
+
+
+class RunCheckersTest(unittest.TestCase):
+
+    def test_deadline(self):
+        fast = FakeChecker('fast', ['fast result'])
+        slow = FakeChecker('slow', ['slow result'], delay=0.5)
+        STATS.clear()
+        start = time.time()
+        self.assertEqual(run_checkers([slow, fast], 0.1), ['fast result'])
+        self.assertTrue(time.time() - start < 0.4)
+        self.assertEqual(STATS._counts, {('slow', 'timeouts'): 1})
+        # The slow checker is left to finish in the background.
+        self.assertTrue(slow.finished.wait(2))
+
+    def test_order_and_cache(self):
+        first = FakeChecker('first', ['first result'], delay=0.05)
+        second = FakeChecker('second', None, cached=['cached result'])
+        self.assertEqual(run_checkers([first, second], 1), ['first result', 'cached result'])
+        self.assertFalse(second.finished.is_set())
+
+    def test_cancelled(self):
+        checker = FakeChecker('cancelled', ['result'])
+        checker.cancellation.cancel()
+        self.assertEqual(run_checkers([checker], 1), [])
+
+
+class CancellationTest(unittest.TestCase):
+
+    def test_callbacks(self):
+        calls = []
+        cancellation = Cancellation()
+        cancellation.on_cancel(lambda: calls.append('first'))
+        remove = cancellation.on_cancel(lambda: calls.append('removed'))
+        remove()
+        cancellation.cancel()
+        cancellation.cancel()
+        self.assertEqual(calls, ['first'])
+        # Too late to be called later.
+        cancellation.on_cancel(lambda: calls.append('late'))
+        self.assertEqual(calls, ['first', 'late'])
+
+
+if __name__ == '__main__':
+    unittest.main()
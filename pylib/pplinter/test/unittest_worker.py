@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import StringIO
+
+from pplinter.worker import Worker, encode_buffers
+
+
+class WorkerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'latin.py')
+        self.sys_path = list(sys.path)
+
+    def tearDown(self):
+        sys.path[:] = self.sys_path
+        shutil.rmtree(self.directory)
+
+    def serve(self, *jobs, **kwargs):
+        stdin = StringIO.StringIO(''.join(json.dumps(job) + '\n' for job in jobs))
+        stdout = StringIO.StringIO()
+        kwargs.get('worker_class', Worker)(stdin, stdout).serve()
+        return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def make_job(self, source):
+        return {
+            'buffers': encode_buffers({self.path: source}),
+            'cwd': self.directory,
+            'options': ['--reports', 'n', '--include-ids', 'y', self.path],
+            'paths_before': [],
+            'paths_after': [],
+        }
+
+    def test_non_utf8_module(self):
+        source = '\n'.join((
+            '# -*- coding: latin-1 -*-',
+            '"""docstring"""',
+            '__revision__ = 1',
+            '# FIXME: d\xe9j\xe0 vu',
+            '',
+        ))
+        replies = self.serve(self.make_job(source), self.make_job(source))
+        self.assertEqual(len(replies), 2)
+        for reply in replies:
+            self.assertNotIn('error', reply)
+            notes = [msg for msg_id, line, column, obj, msg in reply['messages'] if msg_id == 'W0511']
+            self.assertEqual(notes, [u'FIXME: déjà vu'])
+
+    def test_invalid_reply(self):
+
+        class BrokenWorker(Worker):
+            def run(self, job):
+                return {'messages': [['W0511', 1, 0, '', job['text'].encode('latin-1')]], 'errors': '', 'config_files': {}}
+
+        replies = self.serve({'text': u'déjà vu'}, {'text': 'ok'}, worker_class=BrokenWorker)
+        self.assertEqual(len(replies), 2)
+        self.assertTrue(replies[0]['error'].startswith('Invalid reply'))
+        self.assertEqual(replies[1]['messages'][0][4], 'ok')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,321 @@
+"""
+A long running pylint process.
+
+This module is started by pplinter.pool in the user's configured version of
+python. It reads one JSON encoded job per line from stdin, runs pylint and
+writes one JSON encoded reply per line to stdout, holding pylint's messages
+as lists rather than formatted text. Pylint, its checkers and
+the ASTNG of every imported module stay loaded between jobs.
+
+Jobs carry the text of the buffers to lint, so they don't need to be saved
+to disk first.
+
+"""
+
+import json
+import os
+import sys
+import traceback
+import StringIO
+
+from pylint.reporters import BaseReporter
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+
+def decode_buffers(buffers):
+    """
+    Buffers are sent as unicode strings holding one character per byte of
+    source, because JSON can't hold bytes and the source may not be UTF-8.
+
+    """
+    return dict((path, text.encode('latin-1')) for path, text in buffers.items())
+
+
+def encode_buffers(buffers):
+    return dict((path, text.decode('latin-1')) for path, text in buffers.items())
+
+
+def decode_text(text, encoding=None):
+    """
+    Pylint messages hold the bytes of the module they were found in, such as
+    the text of a FIXME note. Decode them so that they can be sent as JSON.
+
+    """
+    if not isinstance(text, str):
+        return text
+    try:
+        return text.decode(encoding or 'utf-8', 'replace')
+    except LookupError:
+        # An unknown encoding declaration.
+        return text.decode('utf-8', 'replace')
+
+
+def get_memory_usage():
+    """Return the peak resident memory of this process in kilobytes."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        # OS X reports bytes rather than kilobytes.
+        usage /= 1024
+    return usage
+
+
+class PylintReporter(BaseReporter):
+    """
+    A pylint reporter which collects messages as compact lists of message
+    id, line, column, object and message, ready to be sent over the pipe.
+    The object and message are decoded with the encoding of their module,
+    given by path in encodings.
+
+    """
+
+    extension = 'txt'
+
+    def __init__(self, output=None, encodings=None):
+        BaseReporter.__init__(self, output)
+        self.messages = []
+        self.encodings = encodings or {}
+        self.encoding = None
+
+    def on_set_current_module(self, module, filepath):
+        self.encoding = filepath and self.encodings.get(os.path.abspath(filepath))
+
+    def add_message(self, msg_id, location, msg):
+        path, module, obj, line, col_offset = location
+        self.messages.append([
+            msg_id,
+            line,
+            col_offset,
+            decode_text(obj, self.encoding),
+            decode_text(msg, self.encoding),
+        ])
+
+    def _display(self, layout):
+        pass
+
+
+def get_run_class(buffers):
+    """
+    Return a pylint Run class which checks the given source code buffers
+    instead of reading their paths from disk.
+
+    """
+
+    from logilab.astng import MANAGER, ASTNGBuildingException, builder
+    from logilab.common.modutils import modpath_from_file
+    from pylint.lint import PyLinter, Run
+
+    paths = dict((os.path.abspath(path), text) for path, text in buffers.items())
+
+    class BufferLinter(PyLinter):
+
+        def expand_files(self, modules):
+            result = []
+            files = []
+            for path in modules:
+                if os.path.abspath(path) in paths:
+                    try:
+                        modname = '.'.join(modpath_from_file(path))
+                    except ImportError:
+                        modname = os.path.splitext(os.path.basename(path))[0]
+                    result.append({
+                        'path': path,
+                        'name': modname,
+                        'basepath': path,
+                        'basename': modname,
+                    })
+                else:
+                    files.append(path)
+            if files:
+                result.extend(PyLinter.expand_files(self, files))
+            return result
+
+        def get_astng(self, filepath, modname):
+            text = paths.get(os.path.abspath(filepath))
+            if text is None:
+                return PyLinter.get_astng(self, filepath, modname)
+            try:
+                module = builder.ASTNGBuilder(MANAGER).string_build(text, modname, filepath)
+            except SyntaxError, ex:
+                self.add_message('E0001', line=ex.lineno, args=ex.msg)
+                return None
+            except ASTNGBuildingException, ex:
+                self.add_message('F0010', args=ex)
+                return None
+            # Only the buffers need their source kept in memory, and they
+            # are evicted after each job.
+            module.file_bytes = text
+            module.file_encoding = builder._guess_encoding(text)
+            return module
+
+    class BufferRun(Run):
+        LinterClass = BufferLinter
+
+    return BufferRun
+
+
+class Worker(object):
+
+    def __init__(self, stdin, stdout):
+        self.stdin = stdin
+        self.stdout = stdout
+        self.base_path = list(sys.path)
+        self.current_path = None
+        self.mtimes = {}
+
+    def serve(self):
+        while True:
+            line = self.stdin.readline()
+            if not line:
+                break
+            try:
+                job = json.loads(line)
+            except ValueError:
+                reply = {'error': 'Invalid job: %r' % line}
+            else:
+                reply = self.run(job)
+            reply['rss'] = get_memory_usage()
+            try:
+                data = json.dumps(reply)
+            except (TypeError, ValueError):
+                # Undecodable bytes (a UnicodeDecodeError) or values which
+                # JSON can't hold must not stop the worker.
+                data = json.dumps({
+                    'error': 'Invalid reply: %s' % traceback.format_exc(),
+                    'rss': reply['rss'],
+                })
+            self.stdout.write(data + '\n')
+            self.stdout.flush()
+
+    def run(self, job):
+
+        stdout, sys.stdout = sys.stdout, StringIO.StringIO()
+        stderr, sys.stderr = sys.stderr, StringIO.StringIO()
+        cwd = os.getcwd()
+        try:
+
+            os.chdir(job['cwd'] or cwd)
+            self.set_path(job['paths_before'], job['paths_after'])
+            self.evict_changed_modules()
+
+            from logilab.astng.builder import _guess_encoding
+            from pylint import config
+
+            buffers = decode_buffers(job['buffers'])
+            options = list(job['options'])
+
+            # Pylint looks for its configuration file once, when it is first
+            # imported. Look for it again because each job has its own cwd.
+            pylintrc = config.find_pylintrc()
+            config_files = {}
+            if pylintrc:
+                pylintrc = os.path.abspath(pylintrc)
+                options.insert(0, '--rcfile=%s' % pylintrc)
+                config_files[pylintrc] = os.path.getmtime(pylintrc)
+
+            encodings = dict(
+                (os.path.abspath(path), _guess_encoding(text))
+                for path, text in buffers.items()
+            )
+            reporter = PylintReporter(encodings=encodings)
+            try:
+                get_run_class(buffers)(options, reporter=reporter, exit=False)
+            except SystemExit:
+                pass
+
+            # The buffers are usually being edited, so they are not worth
+            # keeping. Everything they imported is.
+            files = set(os.path.abspath(path) for path in buffers)
+            self.evict_modules(lambda module_file: module_file in files)
+            self.record_mtimes()
+
+            return {
+                'messages': reporter.messages,
+                'errors': sys.stderr.getvalue(),
+                'config_files': config_files,
+            }
+
+        except Exception:
+            return {'error': traceback.format_exc()}
+
+        finally:
+            os.chdir(cwd)
+            sys.stdout = stdout
+            sys.stderr = stderr
+
+    def set_path(self, paths_before, paths_after):
+        """
+        Build sys.path the same way that the one-shot pylint process does.
+        Cached modules are dropped when it changes, because module names may
+        then resolve to different files.
+
+        """
+
+        path = []
+        for item in paths_before + self.base_path + paths_after:
+            if item and item not in path:
+                path.append(item)
+        sys.path[:] = path
+
+        if path != self.current_path:
+            if self.current_path is not None:
+                self.evict_modules(lambda module_file: True)
+            self.current_path = path
+
+    def evict_changed_modules(self):
+        """
+        Remove modules from the ASTNG cache if their source file has changed
+        since they were cached.
+
+        """
+
+        def is_stale(module_file):
+            try:
+                mtime = os.path.getmtime(module_file)
+            except OSError:
+                return True
+            return self.mtimes.get(module_file) != mtime
+
+        self.evict_modules(is_stale)
+
+    def record_mtimes(self):
+        from logilab.astng import MANAGER
+        for module in MANAGER.astng_cache.values():
+            module_file = getattr(module, 'file', None)
+            if module_file:
+                module_file = os.path.abspath(module_file)
+                if module_file not in self.mtimes:
+                    try:
+                        self.mtimes[module_file] = os.path.getmtime(module_file)
+                    except OSError:
+                        pass
+
+    def evict_modules(self, is_stale):
+        from logilab.astng import MANAGER
+        for modname, module in MANAGER.astng_cache.items():
+            module_file = getattr(module, 'file', None)
+            if not module_file:
+                # Built from a living module, such as __builtin__.
+                continue
+            module_file = os.path.abspath(module_file)
+            if is_stale(module_file):
+                del MANAGER.astng_cache[modname]
+                self.mtimes.pop(module_file, None)
+        MANAGER._mod_file_cache.clear()
+
+
+def main():
+    # Pylint and anything it imports must not write to the pipe directly.
+    stdin, stdout = sys.stdin, sys.stdout
+    sys.stdin = StringIO.StringIO()
+    Worker(stdin, stdout).serve()
+
+
+if __name__ == '__main__':
+    main()
@@ -38,7 +38,10 @@ messages nor reports. XXX not true, emit a 07 report !
 
 """
 
+import os
+import sys
 import tokenize
+from collections import OrderedDict
 from os import listdir
 from os.path import dirname, join, isdir, splitext
 
@@ -46,6 +49,7 @@ from logilab.astng.utils import ASTWalker
 from logilab.common.modutils import load_module_from_file
 from logilab.common.configuration import OptionsProviderMixIn
 
+from pylint import config
 from pylint.reporters import diff_string, EmptyReport
 
 def table_lines_from_stats(stats, old_stats, columns):
@@ -110,6 +114,20 @@ class BaseChecker(OptionsProviderMixIn, ASTWalker):
     def close(self):
         """called after visiting project (i.e set of modules)"""
 
+    # parallel mode: checkers keeping project wide data for close() must
+    # send it from the processes which visited the modules to the main one
+
+    def get_map_data(self):
+        """return picklable data collected while visiting a module, in a
+        child process
+        """
+        return None
+
+    def reduce_map_data(self, data):
+        """merge the data returned by get_map_data for each module, in the
+        modules order, before close() is called in the main process
+        """
+
 
 class BaseRawChecker(BaseChecker):
     """base class for raw checkers"""
@@ -130,34 +148,201 @@ class BaseRawChecker(BaseChecker):
         raise NotImplementedError()
 
 
+class BaseTokenChecker(BaseRawChecker):
+    """base class for token checkers (see ITokenChecker)"""
+
+    def process_module(self, node):
+        """process a module on its own, when not given the linter's tokens"""
+        self.process_tokens(tokenize_module(node))
+
+
+def tokenize_module(node):
+    """return the list of a module's tokens
+
+    with python 2, the lines are decoded first if the module declares an
+    encoding, so that the length of international text is right
+    """
+    stream = node.file_stream
+    stream.seek(0) # XXX may be removed with astng > 0.23
+    readline = stream.readline
+    if sys.version_info < (3, 0):
+        if node.file_encoding is not None:
+            readline = lambda: stream.readline().decode(node.file_encoding, 'replace')
+    try:
+        return list(tokenize.generate_tokens(readline))
+    finally:
+        stream.close()
+
+
 PY_EXTS = ('.py', '.pyc', '.pyo', '.pyw', '.so', '.dll')
 
+class LazyChecker(BaseChecker):
+    """stands for a checker whose module has not been imported, from the
+    metadata of the checkers index (see package_load)
+
+    It provides the messages, options and reports of the checker, so that they
+    can be listed, enabled and configured as usual. The linter only calls
+    load() to import the module and create the actual checker when some of
+    them are enabled.
+    """
+
+    def __init__(self, linter, filepath, classname, metadata):
+        self.filepath = filepath
+        self.classname = classname
+        self.name = metadata['name']
+        self.__doc__ = metadata['doc']
+        self.priority = metadata['priority']
+        self.level = metadata['level']
+        self.msgs = metadata['msgs']
+        self.options = metadata['options']
+        self.option_groups = metadata['option_groups']
+        self.reports = tuple((r_id, r_title, self._report_callback(r_id))
+                             for r_id, r_title in metadata['reports'])
+        # options set on the stand in, to be set on the checker as well
+        self._options_set = []
+        self._checker = None
+        BaseChecker.__init__(self, linter)
+
+    def _report_callback(self, reportid):
+        def make_report(sect, stats, old_stats):
+            for r_id, _, r_cb in self.load().reports:
+                if r_id == reportid:
+                    return r_cb(sect, stats, old_stats)
+        return make_report
+
+    def set_option(self, optname, value, action=None, optdict=None):
+        """overridden to set options on the checker too"""
+        BaseChecker.set_option(self, optname, value, action, optdict)
+        self._options_set.append((optname, value, action))
+        if self._checker is not None:
+            self._checker.set_option(optname, value, action)
+
+    def load(self):
+        """import the module of the checker if needed and return the checker"""
+        if self._checker is None:
+            module = load_module_from_file(self.filepath)
+            checker = getattr(module, self.classname)(self.linter)
+            for optname, value, action in self._options_set:
+                checker.set_option(optname, value, action)
+            self._checker = checker
+        return self._checker
+
+
+def checker_metadata(checker):
+    """return the metadata of a checker needed by LazyChecker"""
+    return {'name': checker.name,
+            'doc': checker.__doc__,
+            'priority': checker.priority,
+            'level': checker.level,
+            # keep the order of the messages, in which they are registered
+            'msgs': OrderedDict(checker.msgs.iteritems()),
+            'options': checker.options,
+            'option_groups': getattr(checker, 'option_groups', ()),
+            'reports': [report[:2] for report in checker.reports]}
+
 def initialize(linter):
     """initialize linter with checkers in this package """
     package_load(linter, __path__[0])
 
+# indexes of the checkers registered by the modules of a directory
+_INDEXES = {}
+
 def package_load(linter, directory):
     """load all module and package in the given directory, looking for a
     'register' function in each one, used to register pylint checkers
+
+    The checkers registered by modules are indexed in PYLINT_HOME until the
+    modules change: on later loads, they are registered as LazyChecker
+    without importing the modules.
     """
-    imported = {}
+    key = _package_key(directory)
+    index = _INDEXES.get(directory)
+    if index is None or index['key'] != key:
+        index = config.load_checkers_index(directory)
+    if index is None or index['key'] != key:
+        modules = _package_load(linter, directory)
+        # importing the modules may have compiled them
+        index = {'key': _package_key(directory), 'modules': modules}
+        config.save_checkers_index(directory, index)
+    else:
+        for filename, checkers in index['modules']:
+            if checkers is None:
+                # a package, which isn't indexed
+                _load_module(linter, directory, filename)
+                continue
+            for classname, metadata in checkers:
+                linter.register_checker(LazyChecker(
+                    linter, join(directory, filename), classname, metadata))
+    _INDEXES[directory] = index
+
+def _package_files(directory):
+    """return the modules and packages of the given directory which may
+    register checkers
+    """
+    files = []
     for filename in listdir(directory):
         basename, extension = splitext(filename)
-        if basename in imported or basename == '__pycache__':
+        if basename == '__pycache__':
             continue
         if extension in PY_EXTS and basename != '__init__' or (
              not extension and isdir(join(directory, basename))):
-            try:
-                module = load_module_from_file(join(directory, filename))
-            except ValueError:
-                # empty module name (usually emacs auto-save files)
-                continue
-            except ImportError, exc:
-                import sys
-                print >> sys.stderr, "Problem importing module %s: %s" % (filename, exc)
+            files.append(filename)
+    return files
+
+def _package_key(directory):
+    """return what the checkers index of the given directory depends on"""
+    key = [sys.version]
+    for filename in _package_files(directory):
+        stat = os.stat(join(directory, filename))
+        key.append((filename, stat.st_mtime, stat.st_size))
+    return key
+
+def _package_load(linter, directory):
+    """import the modules and packages of the given directory to register
+    their checkers, and return the classes and metadata of the checkers
+    registered by each module (None for packages)
+    """
+    imported = {}
+    modules = []
+    for filename in _package_files(directory):
+        basename = splitext(filename)[0]
+        if basename in imported:
+            continue
+        checkers = _load_module(linter, directory, filename)
+        if checkers is not None:
+            imported[basename] = 1
+            if isdir(join(directory, filename)):
+                checkers = None
             else:
-                if hasattr(module, 'register'):
-                    module.register(linter)
-                    imported[basename] = 1
+                checkers = [(checker.__class__.__name__, checker_metadata(checker))
+                            for checker in checkers]
+            modules.append((filename, checkers))
+    return modules
+
+def _load_module(linter, directory, filename):
+    """import a module or package and call its register function, returning
+    the checkers it registered, or None if it has no register function
+    """
+    try:
+        module = load_module_from_file(join(directory, filename))
+    except ValueError:
+        # empty module name (usually emacs auto-save files)
+        return None
+    except ImportError, exc:
+        print >> sys.stderr, "Problem importing module %s: %s" % (filename, exc)
+        return None
+    if not hasattr(module, 'register'):
+        return None
+    registered = []
+    register_checker = linter.register_checker
+    def record_checker(checker):
+        registered.append(checker)
+        register_checker(checker)
+    linter.register_checker = record_checker
+    try:
+        module.register(linter)
+    finally:
+        del linter.register_checker
+    return registered
 
 __all__ = ('BaseChecker', 'initialize', 'package_load')
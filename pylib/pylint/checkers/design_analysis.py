@@ -24,6 +24,7 @@ from logilab.astng import Function, If, InferenceError
 
 from pylint.interfaces import IASTNGChecker
 from pylint.checkers import BaseChecker
+from pylint.utils import NodeLocation
 
 import re
 
@@ -237,6 +238,33 @@ class MisdesignChecker(BaseChecker):
             if not iface in self._used_ifaces:
                 self.add_message('R0923', node=iface)
 
+    def get_map_data(self):
+        """send abstract classes and interfaces, and how much they are used,
+        to the main process
+        """
+        return {
+            'abstracts': [NodeLocation(node) for node in self._abstracts],
+            'used_abstracts': [(NodeLocation(node), count)
+                               for node, count in self._used_abstracts.iteritems()],
+            'ifaces': [NodeLocation(node) for node in self._ifaces],
+            'used_ifaces': [NodeLocation(node) for node in self._used_ifaces],
+            }
+
+    def reduce_map_data(self, data):
+        """merge the classes seen by child processes, identified by their
+        location since nodes can't be shared between processes
+        """
+        for module_data in data:
+            self._abstracts.extend(module_data['abstracts'])
+            for location, count in module_data['used_abstracts']:
+                try:
+                    self._used_abstracts[location] += count
+                except KeyError:
+                    self._used_abstracts[location] = count
+            self._ifaces.extend(module_data['ifaces'])
+            for location in module_data['used_ifaces']:
+                self._used_ifaces[location] = 1
+
     def visit_class(self, node):
         """check size of inheritance hierarchy and number of instance attributes
         """
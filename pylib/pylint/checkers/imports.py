@@ -87,7 +87,7 @@ def repr_tree_defs(data, indent_str=None):
         if not files:
             files = ''
         else:
-            files = '(%s)' % ','.join(files)
+            files = '(%s)' % ','.join(sorted(files))
         if indent_str is None:
             lines.append('%s %s' % (mod, files))
             sub_indent_str = '  '
@@ -235,6 +235,21 @@ given file (report RP0402 must not be disabled)'}
             for cycle in get_cycles(self.import_graph):
                 self.add_message('R0401', args=' -> '.join(cycle))
 
+    def get_map_data(self):
+        """send the import graph of the visited module to the main process
+        (dependencies are merged with the other statistics)
+        """
+        return self.import_graph
+
+    def reduce_map_data(self, data):
+        """merge the import graphs of modules visited in child processes"""
+        for import_graph in data:
+            for context_name, importedmodnames in import_graph.iteritems():
+                mgraph = self.import_graph.setdefault(context_name, set())
+                for importedmodname in importedmodnames:
+                    if not importedmodname in mgraph:
+                        mgraph.add(importedmodname)
+
     def visit_import(self, node):
         """triggered when an import statement is seen"""
         modnode = node.root()
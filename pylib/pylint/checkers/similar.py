@@ -290,6 +290,15 @@ class SimilarChecker(BaseChecker, Similar):
         """
         self.append_stream(self.linter.current_name, node.file_stream)
 
+    def get_map_data(self):
+        """send the lines of the visited module to the main process"""
+        return self.linesets
+
+    def reduce_map_data(self, data):
+        """gather the lines of every module visited in child processes"""
+        for linesets in data:
+            self.linesets.extend(linesets)
+
     def close(self):
         """compute and display similarities on closing (i.e. end of parsing)"""
         total = sum([len(lineset) for lineset in self.linesets])
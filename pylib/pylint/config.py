@@ -20,6 +20,10 @@
 import pickle
 import os
 import sys
+try:
+    from hashlib import sha1
+except ImportError:
+    from sha import new as sha1
 from os.path import exists, isfile, join, expanduser, abspath, dirname
 
 # pylint home is used to save old runs results ################################
@@ -40,6 +44,13 @@ if not exists(PYLINT_HOME):
     except OSError:
         print >> sys.stderr, 'Unable to create directory %s' % PYLINT_HOME
 
+# built modules are pickled here when the astng cache is enabled
+ASTNG_CACHE_DIR = join(PYLINT_HOME, 'astng')
+# results of each checked module are pickled here by incremental runs
+INCREMENTAL_DIR = join(PYLINT_HOME, 'incremental')
+# metadata of the checkers of each checkers package, to load them lazily
+CHECKERS_INDEX_DIR = join(PYLINT_HOME, 'checkers')
+
 def get_pdata_path(base_name, recurs):
     """return the path of the file which should contain old search data for the
     given base_name with the given options values
@@ -72,6 +83,61 @@ def save_results(results, base):
     except (IOError, OSError), ex:
         print >> sys.stderr, 'Unable to create file %s: %s' % (data_file, ex)
 
+def get_record_path(filepath):
+    """return the path of the file which should contain the results of the
+    last incremental check of the given module file
+    """
+    key = sha1(abspath(filepath)).hexdigest()
+    return join(INCREMENTAL_DIR, key + '.pickle')
+
+def load_module_record(filepath):
+    """try to unpickle and return the last incremental check record of the
+    given module file
+
+    return None if it doesn't exists or is corrupted
+    """
+    try:
+        return pickle.load(open(get_record_path(filepath), 'rb'))
+    except:
+        return None
+
+def save_module_record(filepath, record):
+    """pickle the incremental check record of the given module file"""
+    record_file = get_record_path(filepath)
+    try:
+        if not exists(INCREMENTAL_DIR):
+            os.mkdir(INCREMENTAL_DIR)
+        pickle.dump(record, open(record_file, 'wb'), pickle.HIGHEST_PROTOCOL)
+    except (IOError, OSError), ex:
+        print >> sys.stderr, 'Unable to create file %s: %s' % (record_file, ex)
+
+def get_checkers_index_path(directory):
+    """return the path of the file which should contain the index of the
+    checkers registered by the modules of the given directory
+    """
+    key = sha1(abspath(directory)).hexdigest()
+    return join(CHECKERS_INDEX_DIR, key + '.pickle')
+
+def load_checkers_index(directory):
+    """try to unpickle and return the checkers index of the given directory
+
+    return None if it doesn't exists or is corrupted
+    """
+    try:
+        return pickle.load(open(get_checkers_index_path(directory), 'rb'))
+    except:
+        return None
+
+def save_checkers_index(directory, index):
+    """pickle the checkers index of the given directory"""
+    index_file = get_checkers_index_path(directory)
+    try:
+        if not exists(CHECKERS_INDEX_DIR):
+            os.mkdir(CHECKERS_INDEX_DIR)
+        pickle.dump(index, open(index_file, 'wb'), pickle.HIGHEST_PROTOCOL)
+    except (IOError, OSError, pickle.PicklingError, TypeError), ex:
+        print >> sys.stderr, 'Unable to create file %s: %s' % (index_file, ex)
+
 # location of the configuration file ##########################################
 
 
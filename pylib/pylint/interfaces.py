@@ -50,6 +50,20 @@ class IRawChecker(IChecker):
         """
 
 
+class ITokenChecker(IRawChecker):
+    """interface for raw checkers which only need the module's tokens: the
+    linter tokenizes each module once and gives the same tokens to all of
+    them
+    """
+
+    def process_tokens(self, tokens):
+        """process a module's tokens
+
+        tokens is a list of 5-tuples as generated by tokenize.generate_tokens,
+        shared with the other checkers, so it must not be modified
+        """
+
+
 class IASTNGChecker(IChecker):
     """ interface for checker which prefers receive events according to
     statement type
@@ -95,4 +109,4 @@ class IReporter(Interface):
         """
 
 
-__all__ = ('IRawChecker', 'ILinter', 'IReporter')
+__all__ = ('IRawChecker', 'ITokenChecker', 'ILinter', 'IReporter')
@@ -35,10 +35,17 @@ import os
 import re
 import tokenize
 from warnings import warn
+try:
+    from hashlib import sha1
+except ImportError:
+    from sha import new as sha1
 
 from logilab.common.configuration import UnsupportedAction, OptionsManagerMixIn
 from logilab.common.optik_ext import check_csv
-from logilab.common.modutils import load_module_from_name, get_module_part
+from logilab.common.modutils import (load_module_from_name, get_module_part,
+                                     get_source_file, NoSourceFile,
+                                     is_python_source, STD_LIB_DIR,
+                                     EXT_LIB_DIR)
 from logilab.common.interface import implements
 from logilab.common.textutils import splitstrip
 from logilab.common.ureports import Table, Text, Section
@@ -48,13 +55,17 @@ from logilab.astng import MANAGER, nodes, ASTNGBuildingException
 from logilab.astng.__pkginfo__ import version as astng_version
 
 from pylint.utils import (PyLintASTWalker, UnknownMessage, MessagesHandlerMixIn,
-                          ReportsHandlerMixIn, MSG_TYPES, expand_modules)
-from pylint.interfaces import ILinter, IRawChecker, IASTNGChecker
-from pylint.checkers import (BaseRawChecker, EmptyReport,
-                             table_lines_from_stats)
+                          ReportsHandlerMixIn, LineStates, SuppressionMapping,
+                          CheckersProfiler, MSG_TYPES, MSG_TYPES_STATUS,
+                          expand_modules)
+from pylint.interfaces import (ILinter, IRawChecker, ITokenChecker,
+                               IASTNGChecker)
+from pylint.checkers import (BaseRawChecker, LazyChecker, EmptyReport,
+                             table_lines_from_stats, tokenize_module)
 from pylint.reporters.text import (TextReporter, ParseableTextReporter,
                                    VSTextReporter, ColorizedTextReporter)
 from pylint.reporters.html import HTMLReporter
+from pylint.reporters import CollectingReporter
 from pylint import config
 
 from pylint.__pkginfo__ import version
@@ -186,11 +197,38 @@ class PyLinter(OptionsManagerMixIn, MessagesHandlerMixIn, ReportsHandlerMixIn,
                   'dest' : 'black_list', 'default' : ('CVS',),
                   'help' : 'Add files or directories to the blacklist. \
 They should be base names, not paths.'}),
+                ('jobs',
+                 {'type' : 'int', 'metavar' : '<n-processes>', 'default' : 1,
+                  'short': 'j',
+                  'help' : 'Use multiple processes to speed up Pylint. \
+Modules are checked in child processes, and their messages and statistics \
+merged in the same order as a single process would produce them. Only \
+available where processes can be forked.'}),
+
                 ('persistent',
                  {'default': True, 'type' : 'yn', 'metavar' : '<y_or_n>',
                   'level': 1,
                   'help' : 'Pickle collected data for later comparisons.'}),
 
+                ('incremental',
+                 {'default': False, 'type' : 'yn', 'metavar' : '<y_or_n>',
+                  'level': 1,
+                  'help' : 'Only check modules which changed since the last \
+incremental run, or whose options or dependencies did, and replay the \
+messages of the others. Dependencies are the modules imported directly or \
+not, standard ones excepted; modules which had a fatal message are always \
+checked again.'}),
+
+                ('astng-cache',
+                 {'default': False, 'type' : 'yn', 'metavar' : '<y_or_n>',
+                  'level': 1,
+                  'help' : 'Pickle the syntax trees of checked and imported \
+modules, keyed by the hash of their source, so that later runs don\'t have \
+to parse them again. Only the latest source of each module is kept. Loading \
+a tree is about a quarter faster than building it, but building and pickling \
+it is about a third slower, so this only pays off for modules which rarely \
+change.'}),
+
                 ('load-plugins',
                  {'type' : 'csv', 'metavar' : '<modules>', 'default' : (),
                   'level': 1,
@@ -249,6 +287,13 @@ warning, statement which respectively contain the number of errors / warnings\
                   'help' : 'Add a comment according to your evaluation note. \
 This is used by the global evaluation report (RP0004).'}),
 
+                ('profile-checkers',
+                 {'default': 0, 'type' : 'yn', 'metavar' : '<y_or_n>',
+                  'group': 'Reports', 'level': 1,
+                  'help' : 'Time the methods of the checkers and report their \
+cumulative time, number of calls and time per module, by checker and by \
+method (RP0005).'}),
+
                 ('enable',
                  {'type' : 'csv', 'metavar': '<msg ids>',
                   'short': 'e',
@@ -295,6 +340,7 @@ This is used by the global evaluation report (RP0004).'}),
         self.current_name = None
         self.current_file = None
         self.stats = None
+        self._profiler = None
         # init options
         self.options = options + PyLinter.make_options()
         self.option_groups = option_groups + PyLinter.option_groups
@@ -320,6 +366,8 @@ This is used by the global evaluation report (RP0004).'}),
                          report_messages_stats),
                         ('RP0004', 'Global evaluation',
                          self.report_evaluation),
+                        ('RP0005', 'Checkers profile',
+                         report_checkers_profile),
                         )
         self.register_checker(self)
         self._dynamic_plugins = []
@@ -383,6 +431,8 @@ This is used by the global evaluation report (RP0004).'}),
                 class_name = value.split('.')[-1]
                 reporter_class = getattr(module, class_name)
                 self.set_reporter(reporter_class())
+        elif optname == 'astng-cache':
+            MANAGER.cache_dir = value and config.ASTNG_CACHE_DIR or None
 
         try:
             BaseRawChecker.set_option(self, optname, value, action, optdict)
@@ -432,9 +482,13 @@ This is used by the global evaluation report (RP0004).'}),
     #
     # see func_block_disable_msg.py test case for expected behaviour
 
-    def process_tokens(self, tokens):
+    def process_tokens(self, tokens, encoding=None):
         """process tokens from the current module to search for module/block
         level options
+
+        the tokens of a module declaring an encoding are decoded (see
+        tokenize_module): options found in them are encoded back, so that
+        messages show them as in the module
         """
         comment = tokenize.COMMENT
         newline = tokenize.NEWLINE
@@ -444,6 +498,9 @@ This is used by the global evaluation report (RP0004).'}),
             match = OPTION_RGX.search(line)
             if match is None:
                 continue
+            if encoding is not None and not isinstance(line, str):
+                line = line.encode(encoding, 'replace')
+                match = OPTION_RGX.search(line)
             if match.group(1).strip() == "disable-all" or match.group(1).strip() == 'skip-file':
                 if match.group(1).strip() == "disable-all":
                     self.add_message('I0014', line=start[0])
@@ -479,10 +536,19 @@ This is used by the global evaluation report (RP0004).'}),
                 self.add_message('E0011', args=opt, line=start[0])
 
     def collect_block_lines(self, node, msg_state):
-        """walk ast to collect block level options line numbers"""
+        """walk ast to collect block level options line numbers
+
+        the states of each message are kept as intervals of lines (see
+        LineStates), from which _suppression_mapping is answered
+        """
+        self._module_msgs_state = {}
+        self._suppression_mapping = SuppressionMapping(self._module_msgs_state)
+        self._collect_block_lines(node, msg_state)
+
+    def _collect_block_lines(self, node, msg_state):
         # recurse on children (depth first)
         for child in node.get_children():
-            self.collect_block_lines(child, msg_state)
+            self._collect_block_lines(child, msg_state)
         first = node.fromlineno
         last = node.tolineno
         # first child line number used to distinguish between disable
@@ -512,18 +578,23 @@ This is used by the global evaluation report (RP0004).'}),
                         state = True
                     # set state for all lines for this block
                     first, last = node.block_range(lineno)
-                    for line in xrange(first, last+1):
-                        # do not override existing entries
-                        if not line in self._module_msgs_state.get(msgid, ()):
-                            if line in lines: # state change in the same block
+                    try:
+                        line_states = self._module_msgs_state[msgid]
+                    except KeyError:
+                        line_states = self._module_msgs_state[msgid] = LineStates()
+                    # do not override existing states
+                    for gap_first, gap_last in line_states.gaps(first, last):
+                        start = gap_first
+                        # state changes in the same block
+                        for line in sorted(lines):
+                            if gap_first <= line <= gap_last:
+                                if line > start:
+                                    line_states.add(start, line - 1, state,
+                                                    original_lineno)
+                                    start = line
                                 state = lines[line]
                                 original_lineno = line
-                            if not state:
-                                self._suppression_mapping[(msgid, line)] = original_lineno
-                            try:
-                                self._module_msgs_state[msgid][line] = state
-                            except KeyError:
-                                self._module_msgs_state[msgid] = {line: state}
+                        line_states.add(start, gap_last, state, original_lineno)
                     del lines[lineno]
 
 
@@ -546,6 +617,8 @@ This is used by the global evaluation report (RP0004).'}),
                            if msg[0] != 'F' and self.is_message_enabled(msg))
             if (messages or
                 any(self.report_is_enabled(r[0]) for r in checker.reports)):
+                if isinstance(checker, LazyChecker):
+                    checker = checker.load()
                 neededcheckers.append(checker)
                 checker.active_msgs = messages
         return neededcheckers
@@ -558,7 +631,11 @@ This is used by the global evaluation report (RP0004).'}),
         self.reporter.symbols = self.config.symbols
         if not isinstance(files_or_modules, (list, tuple)):
             files_or_modules = (files_or_modules,)
-        walker = PyLintASTWalker(self)
+        if self.config.profile_checkers:
+            self._profiler = CheckersProfiler()
+        else:
+            self._profiler = None
+        walker = PyLintASTWalker(self, self._profiler)
         checkers = self.prepare_checkers()
         rawcheckers = [c for c in checkers if implements(c, IRawChecker)
                        and c is not self]
@@ -568,30 +645,314 @@ This is used by the global evaluation report (RP0004).'}),
             if implements(checker, IASTNGChecker):
                 walker.add_checker(checker)
         # build ast and check modules or packages
-        for descr in self.expand_files(files_or_modules):
-            modname, filepath = descr['name'], descr['path']
-            if self.config.files_output:
-                reportfile = 'pylint_%s.%s' % (modname, self.reporter.extension)
-                self.reporter.set_output(open(reportfile, 'w'))
-            self.set_current_module(modname, filepath)
-            # get the module representation
-            astng = self.get_astng(filepath, modname)
-            if astng is None:
-                continue
-            self.base_name = descr['basename']
-            self.base_file = descr['basepath']
-            self._ignore_file = False
-            # fix the current file (if the source file was not available or
-            # if it's actually a c extension)
-            self.current_file = astng.file
-            self.check_astng_module(astng, walker, rawcheckers)
-            self._add_suppression_messages()
+        descrs = self.expand_files(files_or_modules)
+        if self.config.incremental:
+            self._check_incremental(descrs, walker, checkers, rawcheckers)
+        elif self._can_check_parallel(descrs):
+            self._check_parallel(descrs, walker, checkers, rawcheckers)
+        else:
+            for descr in descrs:
+                if self.config.files_output:
+                    reportfile = 'pylint_%s.%s' % (descr['name'], self.reporter.extension)
+                    self.reporter.set_output(open(reportfile, 'w'))
+                self._check_module(descr, walker, rawcheckers)
         # notify global end
         self.set_current_module('')
         self.stats['statement'] = walker.nbstatements
         checkers.reverse()
         for checker in checkers:
-            checker.close()
+            if self._profiler is not None and checker is not self:
+                self._profiler.timed(checker, checker.close)()
+            else:
+                checker.close()
+
+    def _check_module(self, descr, walker, rawcheckers):
+        """check a single module or package from its description"""
+        modname, filepath = descr['name'], descr['path']
+        self.set_current_module(modname, filepath)
+        # get the module representation
+        astng = self.get_astng(filepath, modname)
+        if astng is None:
+            return
+        self.base_name = descr['basename']
+        self.base_file = descr['basepath']
+        self._ignore_file = False
+        # fix the current file (if the source file was not available or
+        # if it's actually a c extension)
+        self.current_file = astng.file
+        self.check_astng_module(astng, walker, rawcheckers)
+        self._add_suppression_messages()
+
+    # parallel mode ###########################################################
+
+    # attributes describing the last checked module, which close() and the
+    # messages it adds rely on
+    _module_state_attributes = ('base_name', 'base_file', 'current_name',
+                                'current_file', '_module_msgs_state',
+                                '_module_msg_cats_state',
+                                '_raw_module_msgs_state', '_ignored_msgs',
+                                '_suppression_mapping')
+
+    def _can_check_parallel(self, descrs):
+        return self.config.jobs > 1 and len(descrs) > 1 and hasattr(os, 'fork')
+
+    def _check_parallel(self, descrs, walker, checkers, rawcheckers):
+        """check modules in forked child processes, then merge their messages,
+        statistics and checkers data as if they had been checked here
+        """
+        results = self._parallel_results(descrs, walker, checkers, rawcheckers)
+        self._merge_results(descrs, results, walker, checkers)
+
+    def _parallel_results(self, descrs, walker, checkers, rawcheckers):
+        """check modules in forked child processes and return their results"""
+        import multiprocessing
+        global _PARALLEL_CHECK
+        _PARALLEL_CHECK = (self, walker, checkers, rawcheckers)
+        pool = multiprocessing.Pool(min(self.config.jobs, len(descrs)))
+        try:
+            return pool.map(_check_module_in_child, descrs, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+            _PARALLEL_CHECK = None
+
+    def _merge_results(self, descrs, results, walker, checkers):
+        """merge the results of modules checked apart"""
+        map_data = [[] for checker in checkers]
+        for descr, result in zip(descrs, results):
+            if self.config.files_output:
+                reportfile = 'pylint_%s.%s' % (descr['name'], self.reporter.extension)
+                self.reporter.set_output(open(reportfile, 'w'))
+            self.reporter.on_set_current_module(descr['name'], descr['path'])
+            for msg_id, location, msg in result['messages']:
+                self.reporter.add_message(msg_id, location, msg)
+            _merge_stats(self.stats, result['stats'])
+            self.msg_status |= result['msg_status']
+            walker.nbstatements += result['statements']
+            for attribute, value in result['state'].iteritems():
+                # not set when the module couldn't be built
+                if value is not None:
+                    setattr(self, attribute, value)
+            for data, checker_data in zip(map_data, result['map_data']):
+                data.append(checker_data)
+        for checker, data in zip(checkers, map_data):
+            checker.reduce_map_data(data)
+
+    def _check_module_for_merge(self, descr, walker, checkers, rawcheckers):
+        """check a module in a child process and return everything needed to
+        merge its results in the main process
+        """
+        reporter = self.reporter
+        self.set_reporter(CollectingReporter())
+        try:
+            # start from empty statistics and project wide data, so that only
+            # this module's ones are sent back
+            for checker in checkers:
+                checker.open()
+            self.msg_status = 0
+            walker.nbstatements = 0
+            for attribute in self._module_state_attributes:
+                setattr(self, attribute, None)
+            self._check_module(descr, walker, rawcheckers)
+            if self._profiler is not None:
+                self._profiler.flush(self.stats)
+            return {
+                'messages': self.reporter.messages,
+                'stats': self.stats,
+                'msg_status': self.msg_status,
+                'statements': walker.nbstatements,
+                'state': dict((attribute, getattr(self, attribute, None))
+                              for attribute in self._module_state_attributes),
+                'map_data': [checker.get_map_data() for checker in checkers],
+                }
+        finally:
+            self.set_reporter(reporter)
+
+    # incremental mode ########################################################
+
+    # options which don't change the messages of a module
+    _incremental_ignored_options = ('jobs', 'incremental', 'astng-cache',
+                                    'persistent', 'output-format',
+                                    'files-output', 'include-ids', 'symbols',
+                                    'evaluation', 'comment', 'profile-checkers',
+                                    'rcfile')
+
+    def _check_incremental(self, descrs, walker, checkers, rawcheckers):
+        """check the modules which changed since the last incremental run, or
+        whose options or dependencies did, then merge their results with the
+        recorded results of the other modules
+        """
+        options = self._options_digest()
+        digests = {}
+        results, stale = {}, []
+        for descr in descrs:
+            record = config.load_module_record(descr['path'])
+            if self._record_is_valid(descr['path'], record, options, digests):
+                results[descr['path']] = record['result']
+            else:
+                stale.append(descr)
+        if self._can_check_parallel(stale):
+            stale_results = self._parallel_results(stale, walker, checkers,
+                                                   rawcheckers)
+        else:
+            stale_results = self._serial_results(stale, walker, checkers,
+                                                 rawcheckers)
+        for descr, result in zip(stale, stale_results):
+            results[descr['path']] = result
+            if not result['msg_status'] & MSG_TYPES_STATUS['F']:
+                record = self._make_record(descr, result, options, digests)
+                config.save_module_record(descr['path'], record)
+        self._merge_results(descrs, [results[descr['path']] for descr in descrs],
+                            walker, checkers)
+
+    def _serial_results(self, descrs, walker, checkers, rawcheckers):
+        """check modules one by one apart from the current run and return their
+        results
+        """
+        if not descrs:
+            return []
+        # checking apart starts from empty statistics and project wide data:
+        # keep the current ones to restore them once done
+        stats, msg_status = self.stats, self.msg_status
+        statements = walker.nbstatements
+        results = [self._check_module_for_merge(descr, walker, checkers,
+                                                rawcheckers)
+                   for descr in descrs]
+        for checker in checkers:
+            checker.open()
+        _merge_stats(self.stats, stats)
+        self.msg_status = msg_status
+        walker.nbstatements = statements
+        return results
+
+    def _options_digest(self):
+        """return a digest of the options and messages states which may change
+        the messages of a module
+        """
+        values = [version, sys.version, sorted(self._msgs_state.items())]
+        for provider in self.options_providers:
+            for optname, _, value in provider.options_and_values():
+                if optname not in self._incremental_ignored_options:
+                    # compiled regular expressions
+                    value = getattr(value, 'pattern', value)
+                    values.append((provider.name, optname, value))
+        return sha1(repr(values)).hexdigest()
+
+    def _file_digest(self, filepath, digests):
+        """return the digest of a file's content, None if it can't be read"""
+        if filepath not in digests:
+            try:
+                stream = open(filepath, 'rb')
+                try:
+                    digests[filepath] = sha1(stream.read()).hexdigest()
+                finally:
+                    stream.close()
+            except (IOError, OSError):
+                digests[filepath] = None
+        return digests[filepath]
+
+    def _make_record(self, descr, result, options, digests):
+        """return the record of a module's check, to be saved for the next
+        incremental runs
+        """
+        modules = result['stats'].get('dependencies')
+        if modules is None:
+            # the imports checker is disabled
+            dependencies = None
+        else:
+            dependencies = {}
+            for filepath in self._import_closure(modules, descr['path']):
+                dependencies[filepath] = self._file_digest(filepath, digests)
+        # timings are only meaningful for the run which measured them
+        if 'checkers_profile' in result['stats']:
+            stats = result['stats'].copy()
+            del stats['checkers_profile']
+            result = dict(result, stats=stats)
+        return {'digest': self._file_digest(descr['path'], digests),
+                'options': options,
+                'dependencies': dependencies,
+                'result': result}
+
+    def _import_closure(self, modnames, contextfile):
+        """return the source files of the given modules imported by
+        contextfile, and of the modules they import in turn. As for the
+        imports checker, standard modules are left out: they only change
+        with python, whose version is part of the options digest
+        """
+        closure = set()
+        stack = [(modname, contextfile) for modname in modnames]
+        while stack:
+            modname, contextfile = stack.pop()
+            filepath = self._dependency_file(modname, contextfile)
+            if (filepath is None or filepath in closure
+                    or _is_standard_file(filepath)):
+                continue
+            closure.add(filepath)
+            for imported in self._imported_modules(filepath):
+                stack.append((imported, filepath))
+        return closure
+
+    def _imported_modules(self, filepath):
+        """return the names of the modules, or of the modules of the names,
+        which a source file imports
+        """
+        if not is_python_source(filepath):
+            return ()
+        try:
+            astng = MANAGER.astng_from_file(filepath, source=True)
+        except Exception:
+            # it can't be checked either, its content is still recorded
+            return ()
+        modnames = []
+        for node in astng.nodes_of_class((nodes.Import, nodes.From)):
+            if isinstance(node, nodes.Import):
+                modnames.extend(name for name, _ in node.names)
+            elif node.modname != '__future__':
+                modname = node.modname
+                if node.level:
+                    modname = astng.relative_to_absolute_name(modname,
+                                                              node.level)
+                modnames.append(modname)
+                modnames.extend('%s.%s' % (modname, name)
+                                for name, _ in node.names if name != '*')
+        return modnames
+
+    def _dependency_file(self, modname, contextfile):
+        """return the source file of an imported module, or of the module of
+        an imported name
+        """
+        parts = modname.split('.')
+        while parts:
+            try:
+                filepath = MANAGER.file_from_module_name('.'.join(parts),
+                                                         contextfile)
+            except ASTNGBuildingException:
+                parts.pop()
+                continue
+            if filepath is not None:
+                try:
+                    return get_source_file(filepath)
+                except NoSourceFile:
+                    pass
+            return filepath
+        return None
+
+    def _record_is_valid(self, filepath, record, options, digests):
+        """tell whether a module's record can be replayed: its content,
+        options and the content of the modules it imports, directly or not,
+        must not have changed
+        """
+        return (record is not None
+                and record['options'] == options
+                and record['dependencies'] is not None
+                and record['digest'] == self._file_digest(filepath, digests)
+                and self._dependencies_are_valid(record, digests))
+
+    def _dependencies_are_valid(self, record, digests):
+        for filepath, digest in record['dependencies'].iteritems():
+            if digest != self._file_digest(filepath, digests):
+                return False
+        return True
 
     def expand_files(self, modules):
         """get modules and errors from a list of modules and handle errors
@@ -627,6 +988,7 @@ This is used by the global evaluation report (RP0004).'}),
             self._module_msg_cats_state = {}
             self._raw_module_msgs_state = {}
             self._ignored_msgs = {}
+            self._frame_locations = {}
 
     def get_astng(self, filepath, modname):
         """return a astng representation for a module"""
@@ -643,25 +1005,33 @@ This is used by the global evaluation report (RP0004).'}),
 
     def check_astng_module(self, astng, walker, rawcheckers):
         """check a module from its astng representation, real work"""
+        profiler = self._profiler
+        if profiler is not None:
+            profiler.modules += 1
         # call raw checkers if possible
         if not astng.pure_python:
             self.add_message('I0001', args=astng.name)
         else:
             #assert astng.file.endswith('.py')
-            # invoke IRawChecker interface on self to fetch module/block
-            # level options
-            self.process_module(astng)
+            # tokenize the module once, for self to fetch module/block level
+            # options and for the token checkers
+            tokens = tokenize_module(astng)
+            self.process_tokens(tokens, astng.file_encoding)
             if self._ignore_file:
                 return False
             # walk ast to collect line numbers
             for msg, lines in self._module_msgs_state.iteritems():
                 self._raw_module_msgs_state[msg] = lines.copy()
             orig_state = self._module_msgs_state.copy()
-            self._module_msgs_state = {}
-            self._suppression_mapping = {}
             self.collect_block_lines(astng, orig_state)
             for checker in rawcheckers:
-                checker.process_module(astng)
+                if implements(checker, ITokenChecker):
+                    process, data = checker.process_tokens, tokens
+                else:
+                    process, data = checker.process_module, astng
+                if profiler is not None:
+                    process = profiler.timed(checker, process)
+                process(data)
         # generate events to astng checkers
         walker.walk(astng)
         return True
@@ -681,6 +1051,8 @@ This is used by the global evaluation report (RP0004).'}),
 
         if persistent run, pickle results for later comparison
         """
+        if self._profiler is not None:
+            self._profiler.flush(self.stats)
         if self.base_name is not None:
             # load previous results if any
             previous_stats = config.load_results(self.base_name)
@@ -734,6 +1106,40 @@ This is used by the global evaluation report (RP0004).'}),
                 msg = '%s\n%s' % (msg, config.get_note_message(note))
         sect.append(Text(msg))
 
+# parallel mode helpers #######################################################
+
+# the linter and its checkers, inherited by forked child processes
+_PARALLEL_CHECK = None
+
+def _is_standard_file(filepath):
+    """tell whether a module's file is part of the standard library, as
+    logilab.common.modutils.is_standard_module does for its name
+    """
+    filepath = os.path.abspath(filepath)
+    return (filepath.startswith(os.path.abspath(STD_LIB_DIR))
+            and not filepath.startswith(os.path.abspath(EXT_LIB_DIR)))
+
+def _check_module_in_child(descr):
+    """check a module in a child process (see PyLinter._check_parallel)"""
+    linter, walker, checkers, rawcheckers = _PARALLEL_CHECK
+    return linter._check_module_for_merge(descr, walker, checkers, rawcheckers)
+
+def _merge_stats(stats, module_stats):
+    """merge a module's statistics into the global ones: numbers are added,
+    dictionaries merged recursively, sets joined and lists concatenated
+    """
+    for key, value in module_stats.iteritems():
+        if key not in stats:
+            stats[key] = value
+        elif isinstance(value, dict):
+            _merge_stats(stats[key], value)
+        elif isinstance(value, set):
+            stats[key].update(value)
+        elif isinstance(value, list):
+            stats[key].extend(value)
+        else:
+            stats[key] += value
+
 # some reporting functions ####################################################
 
 def report_total_messages_stats(sect, stats, previous_stats):
@@ -793,6 +1199,31 @@ def report_messages_by_module_stats(sect, stats, _):
         raise EmptyReport()
     sect.append(Table(children=lines, cols=5, rheaders=1))
 
+def report_checkers_profile(sect, stats, _):
+    """make the checkers profile report, by checker then by method"""
+    if 'checkers_profile' not in stats:
+        raise EmptyReport()
+    modules = stats['checkers_profile']['modules'] or 1
+    methods = stats['checkers_profile']['methods']
+    by_checker = {}
+    for (checker, method), timing in methods.iteritems():
+        total = by_checker.setdefault(checker, {'calls': 0, 'time': 0.})
+        total['calls'] += timing['calls']
+        total['time'] += timing['time']
+    lines = ['checker', 'calls', 'time (ms)', 'per module (ms)']
+    for checker, total in sorted(by_checker.iteritems(),
+                                 key=lambda item: -item[1]['time']):
+        lines += (checker, str(total['calls']), '%.2f' % (total['time'] * 1000),
+                  '%.3f' % (total['time'] * 1000 / modules))
+    sect.append(Table(children=lines, cols=4, rheaders=1))
+    lines = ['checker', 'method', 'calls', 'time (ms)', 'per module (ms)']
+    for (checker, method), timing in sorted(methods.iteritems(),
+                                            key=lambda item: -item[1]['time']):
+        lines += (checker, method, str(timing['calls']),
+                  '%.2f' % (timing['time'] * 1000),
+                  '%.3f' % (timing['time'] * 1000 / modules))
+    sect.append(Table(children=lines, cols=5, rheaders=1))
+
 
 # utilities ###################################################################
 
@@ -111,3 +111,18 @@ class BaseReporter:
         pass
 
 
+class CollectingReporter(BaseReporter):
+    """collects messages instead of displaying them, so that they can be
+    sent to another process and displayed there by its own reporter
+    """
+
+    def __init__(self):
+        BaseReporter.__init__(self)
+        self.messages = []
+
+    def add_message(self, msg_id, location, msg):
+        """remember a message for later display"""
+        self.messages.append((msg_id, location, msg))
+
+    def _display(self, layout):
+        pass
@@ -0,0 +1,6 @@
+# -*- coding: latin-1 -*-
+# pylint:frobnicate=1
+# pylint:disable=foo-bar
+"""check unknown options in a module declaring its encoding
+"""
+__revision__ = 1
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""docstring"""
+
+__revision__ = ''
+
+# FIXME: déjà vu
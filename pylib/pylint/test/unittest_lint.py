@@ -22,14 +22,19 @@ from cStringIO import StringIO
 
 from logilab.common.testlib import TestCase, unittest_main, create_files
 from logilab.common.compat import reload
+from logilab.astng import MANAGER, nodes
+from logilab.astng.builder import ASTNGBuilder
 
 from pylint import config
 from pylint.lint import PyLinter, Run, UnknownMessage, preprocess_options, \
      ArgumentPreprocessingError
 from pylint.utils import sort_msgs, PyLintASTWalker, MSG_STATE_SCOPE_CONFIG, \
-     MSG_STATE_SCOPE_MODULE
+     MSG_STATE_SCOPE_MODULE, LineStates
 
 from pylint import checkers
+from pylint.checkers import LazyChecker
+from pylint.reporters import CollectingReporter
+from pylint.reporters.text import TextReporter
 
 class SortMessagesTC(TestCase):
 
@@ -148,6 +153,52 @@ class PyLinterTC(TestCase):
         self.assertEqual(MSG_STATE_SCOPE_MODULE,
                          linter.get_message_state_scope('W0102', 3))
 
+    def test_handle_ignored_message(self):
+        linter = self.linter
+        linter.set_reporter(CollectingReporter())
+        linter.open()
+        linter.set_current_module('toto')
+        linter.disable('W0101')
+        linter.disable('W0102', scope='module', line=3)
+        ignored = []
+        linter.handle_ignored_message = lambda scope, msgid, line, node, args: \
+            ignored.append((scope, msgid, line))
+        linter.add_message('W0101', line=1)
+        linter.add_message('W0102', line=3)
+        linter.add_message('W0109', line=4)
+        self.assertEqual(ignored, [(MSG_STATE_SCOPE_CONFIG, 'W0101', 1),
+                                   (MSG_STATE_SCOPE_MODULE, 'W0102', 3)])
+        self.assertEqual(len(linter.reporter.messages), 1)
+
+    def test_message_location(self):
+        linter = self.linter
+        linter.set_reporter(CollectingReporter())
+        linter.open()
+        astng = ASTNGBuilder().string_build(
+            'class Klass:\n'
+            '    def method(self):\n'
+            '        return lambda: 1\n', 'mod', 'mod.py')
+        linter.set_current_module('mod', 'mod.py')
+        method = astng['Klass']['method']
+        linter.add_message('W0101', node=method.body[0])
+        linter.add_message('W0101', node=method.body[0].value.body)
+        linter.add_message('W0101', node=method)
+        linter.add_message('C0111', line=2)
+        linter._suppression_mapping = {}
+        linter.disable('W0101', scope='module', line=2)
+        linter.add_message('W0101', node=method)
+        linter.add_message('W0101', node=method.body[0])
+        messages = [(msgid, (basename(location[0]),) + location[1:], msg)
+                    for msgid, location, msg in linter.reporter.messages]
+        self.assertEqual(messages, [
+            ('W0101', ('mod.py', 'mod', 'Klass.method', 3, 8), 'Unreachable code'),
+            ('W0101', ('mod.py', 'mod', 'Klass.method.<lambda>', 3, 23), 'Unreachable code'),
+            ('W0101', ('mod.py', 'mod', 'Klass.method', 2, 4), 'Unreachable code'),
+            ('C0111', ('mod.py', 'mod', '', 2, 0), 'Missing docstring'),
+            ('W0101', ('mod.py', 'mod', 'Klass.method', 3, 8), 'Unreachable code'),
+            ])
+        self.assertEqual(linter.stats['by_msg'], {'W0101': 4, 'C0111': 1})
+
     def test_enable_message_block(self):
         linter = self.linter
         linter.open()
@@ -206,6 +257,24 @@ class PyLinterTC(TestCase):
         self.assertEqual(106, linter._suppression_mapping['E1101', 108])
         self.assertEqual(109, linter._suppression_mapping['E1101', 110])
 
+    def test_enable_message_line_after_block_lines(self):
+        linter = self.linter
+        linter.open()
+        filepath = join(INPUTDIR, 'func_block_disable_msg.py')
+        linter.set_current_module('func_block_disable_msg')
+        astng = linter.get_astng(filepath, 'func_block_disable_msg')
+        linter.process_module(astng)
+        linter.collect_block_lines(astng, linter._module_msgs_state.copy())
+        # checkers may still change the state of a message on a single line
+        linter.enable('E1101', 'module', 43)
+        linter.disable('E1101', 'module', 46)
+        linter.disable('W0612', 'module', 5)
+        self.assertFalse(linter.is_message_enabled('E1101', 42))
+        self.assertTrue(linter.is_message_enabled('E1101', 43))
+        self.assertFalse(linter.is_message_enabled('E1101', 46))
+        self.assertFalse(linter.is_message_enabled('W0612', 5))
+        self.assertTrue(linter.is_message_enabled('W0612', 6))
+
     def test_enable_by_symbol(self):
         """messages can be controlled by symbolic names.
 
@@ -319,6 +388,220 @@ class PyLinterTC(TestCase):
                       'miscellaneous', 'similarities')
         self.assertFalse(any(name in checker_names for name in should_not))
 
+    def _make_linter(self, jobs, incremental=False):
+        linter = PyLinter()
+        linter.config.persistent = 0
+        checkers.initialize(linter)
+        linter.set_option('jobs', jobs)
+        linter.set_option('incremental', incremental)
+        linter.set_option('include-ids', True)
+        return linter
+
+    def _check_output(self, args, jobs, linter=None):
+        linter = linter or self._make_linter(jobs)
+        output = StringIO()
+        linter.set_reporter(TextReporter(output))
+        linter.check(args)
+        return output.getvalue(), linter.msg_status
+
+    def test_parallel_check(self):
+        if not hasattr(os, 'fork'):
+            self.skipTest('parallel mode needs fork')
+        # an abstract class used by another module, which is checked by
+        # another process
+        tmpdir = tempfile.mkdtemp()
+        try:
+            abstract = join(tmpdir, 'abstract.py')
+            concrete = join(tmpdir, 'concrete.py')
+            open(abstract, 'w').write(
+                '"""docstring"""\n'
+                'class Abstract(object):\n'
+                '    """docstring"""\n'
+                '    def run(self):\n'
+                '        """docstring"""\n'
+                '        raise NotImplementedError()\n')
+            open(concrete, 'w').write(
+                '"""docstring"""\n'
+                'from abstract import Abstract\n'
+                'class Concrete(Abstract):\n'
+                '    """docstring"""\n'
+                '    def run(self):\n'
+                '        """docstring"""\n')
+            args = [abstract, concrete] + [join(INPUTDIR, name) for name in (
+                'func_w0401.py', 'w0401_cycle.py', 'w0801_same.py',
+                'func_w0801.py', 'syntax_error.py')]
+            sys.path.insert(0, tmpdir)
+            try:
+                serial = self._check_output(args, 1)
+                parallel = self._check_output(args, 3)
+            finally:
+                sys.path.remove(tmpdir)
+        finally:
+            rmtree(tmpdir)
+        self.assertEqual(parallel, serial)
+        for msgid in ('R0401', 'R0801', 'R0922', 'E0001'):
+            self.assertTrue(msgid in serial[0], msgid)
+
+    def test_incremental_check(self):
+        tmpdir = tempfile.mkdtemp()
+        incremental_dir = config.INCREMENTAL_DIR
+        config.INCREMENTAL_DIR = join(tmpdir, 'incremental')
+        try:
+            base = join(tmpdir, 'base.py')
+            derived = join(tmpdir, 'derived.py')
+            open(base, 'w').write(
+                '"""docstring"""\n'
+                'class Base(object):\n'
+                '    """docstring"""\n'
+                '    def run(self):\n'
+                '        """docstring"""\n')
+            open(derived, 'w').write(
+                '"""docstring"""\n'
+                'from base import Base\n'
+                'class Derived(Base):\n'
+                '    """docstring"""\n'
+                '    def run(self):\n'
+                '        """docstring"""\n')
+            args = [base, derived] + [join(INPUTDIR, name) for name in (
+                'func_w0401.py', 'w0801_same.py', 'func_w0801.py',
+                'syntax_error.py')]
+            sys.path.insert(0, tmpdir)
+            try:
+                serial = self._check_output(args, 1)
+                cold = self._check_output(args, 1, self._make_linter(1, True))
+                # nothing changed: every module is replayed
+                linter = self._make_linter(1, True)
+                linter._check_module_for_merge = None
+                warm = self._check_output(args, 1, linter)
+                # a dependency changed: derived.py is checked again
+                open(base, 'w').write(
+                    '"""docstring"""\n'
+                    'class Base(object):\n'
+                    '    """docstring"""\n'
+                    '    def run(self, arg):\n'
+                    '        """docstring"""\n'
+                    '        return arg\n')
+                MANAGER.astng_cache.pop('base', None)
+                changed = self._check_output(args, 1, self._make_linter(1, True))
+                changed_serial = self._check_output(args, 1)
+            finally:
+                sys.path.remove(tmpdir)
+        finally:
+            config.INCREMENTAL_DIR = incremental_dir
+            rmtree(tmpdir)
+        self.assertEqual(cold, serial)
+        self.assertEqual(warm, serial)
+        self.assertEqual(changed, changed_serial)
+        self.assertFalse('W0221' in serial[0])
+        self.assertTrue('W0221' in changed[0])
+
+    def test_incremental_check_indirect_dependency(self):
+        # indirect_base.py is only imported through indirect_reexport.py, and neither is checked
+        tmpdir = tempfile.mkdtemp()
+        incremental_dir = config.INCREMENTAL_DIR
+        config.INCREMENTAL_DIR = join(tmpdir, 'incremental')
+        try:
+            base = join(tmpdir, 'indirect_base.py')
+            open(base, 'w').write(
+                '"""docstring"""\n'
+                'class Base(object):\n'
+                '    """docstring"""\n'
+                '    def run(self):\n'
+                '        """docstring"""\n')
+            open(join(tmpdir, 'indirect_reexport.py'), 'w').write(
+                '"""docstring"""\n'
+                'from indirect_base import Base\n'
+                '__all__ = [\'Base\']\n')
+            derived = join(tmpdir, 'indirect_derived.py')
+            open(derived, 'w').write(
+                '"""docstring"""\n'
+                'from indirect_reexport import Base\n'
+                'class Derived(Base):\n'
+                '    """docstring"""\n'
+                '    def run(self):\n'
+                '        """docstring"""\n')
+            sys.path.insert(0, tmpdir)
+            try:
+                cold = self._check_output([derived], 1, self._make_linter(1, True))
+                open(base, 'w').write(
+                    '"""docstring"""\n'
+                    'class Base(object):\n'
+                    '    """docstring"""\n'
+                    '    def run(self, arg):\n'
+                    '        """docstring"""\n'
+                    '        return arg\n')
+                MANAGER.astng_cache.pop('indirect_base', None)
+                MANAGER.astng_cache.pop('indirect_reexport', None)
+                changed = self._check_output([derived], 1, self._make_linter(1, True))
+            finally:
+                sys.path.remove(tmpdir)
+        finally:
+            config.INCREMENTAL_DIR = incremental_dir
+            rmtree(tmpdir)
+        self.assertFalse('W0221' in cold[0])
+        self.assertTrue('W0221' in changed[0])
+
+    def test_profile_checkers(self):
+        args = [join(INPUTDIR, name) for name in (
+            'func_w0401.py', 'w0401_cycle.py', 'func_w0801.py')]
+        expected = self._check_output(args, 1)[0]
+        for jobs in (1, 2):
+            if jobs > 1 and not hasattr(os, 'fork'):
+                continue
+            linter = self._make_linter(jobs)
+            linter.set_option('profile-checkers', True)
+            output, _ = self._check_output(args, jobs, linter)
+            # same messages, the reports only differ by the profile
+            self.assertEqual(output.split('Report\n')[0],
+                             expected.split('Report\n')[0])
+            self.assertTrue('Checkers profile' in output)
+            self.assertFalse('Checkers profile' in expected)
+            profile = linter.stats['checkers_profile']
+            self.assertEqual(profile['modules'], 3)
+            methods = profile['methods']
+            self.assertEqual(methods[('metrics', 'process_tokens')]['calls'], 3)
+            self.assertEqual(methods[('similarities', 'process_module')]['calls'], 3)
+            self.assertEqual(methods[('similarities', 'close')]['calls'], 1)
+            self.assertTrue(methods[('variables', 'visit_name')]['calls'] > 3)
+
+    def test_lazy_checkers(self):
+        tmpdir = tempfile.mkdtemp()
+        index_dir = config.CHECKERS_INDEX_DIR
+        config.CHECKERS_INDEX_DIR = tmpdir
+        checkers._INDEXES.clear()
+        try:
+            # the first load imports the checkers and indexes them
+            linter = self._make_linter(1)
+            self.assertFalse([checker for checker in linter.get_checkers()
+                              if isinstance(checker, LazyChecker)])
+            checkers._INDEXES.clear()
+            linter = self._make_linter(1)
+        finally:
+            config.CHECKERS_INDEX_DIR = index_dir
+            checkers._INDEXES.clear()
+            rmtree(tmpdir)
+        similar = linter._checkers['similarities'][0]
+        self.assertTrue(isinstance(similar, LazyChecker))
+        self.assertTrue('R0801' in linter._messages)
+        self.assertTrue('Similar lines' in linter.get_message_help('R0801'))
+        linter.global_set_option('min-similarity-lines', 8)
+        linter.set_option('reports', False)
+        linter.set_option('disable', 'all')
+        linter.set_option('enable', 'similarities')
+        names = [checker.name for checker in linter.prepare_checkers()]
+        self.assertEqual(names, ['master', 'similarities'])
+        checker = similar.load()
+        self.assertFalse(isinstance(checker, LazyChecker))
+        self.assertTrue(linter.prepare_checkers()[1] is checker)
+        self.assertEqual(checker.min_lines, 8)
+        linter.global_set_option('min-similarity-lines', 5)
+        self.assertEqual(checker.min_lines, 5)
+        self.assertEqual(linter._checkers['variables'][0]._checker, None)
+        # messages are in the order of the checker's, e.g. for I0011
+        format_checker = linter._checkers['format'][0]
+        self.assertEqual(list(format_checker.msgs),
+                         list(format_checker.load().msgs))
+
     def test_disable_similar(self):
         self.linter.set_option('disable', 'RP0801')
         self.linter.set_option('disable', 'R0801')
@@ -334,6 +617,102 @@ class PyLinterTC(TestCase):
             self.assertFalse(cname in checker_names, cname)
 
 
+class LineStatesTC(TestCase):
+
+    def test_intervals(self):
+        states = LineStates()
+        states.add(10, 20, False, 10)
+        states.add(30, 40, True, 30)
+        self.assertEqual(states.gaps(1, 50), [(1, 9), (21, 29), (41, 50)])
+        self.assertEqual(states.gaps(15, 35), [(21, 29)])
+        self.assertEqual(states.gaps(12, 18), [])
+        states.add(21, 29, False, 25)
+        self.assertFalse(states[10])
+        self.assertFalse(states[29])
+        self.assertTrue(states[40])
+        self.assertRaises(KeyError, states.__getitem__, 41)
+        self.assertFalse(9 in states)
+        self.assertEqual(states.disabled_by(28), 25)
+        self.assertRaises(KeyError, states.disabled_by, 35)
+
+    def test_set_line(self):
+        states = LineStates()
+        states.add(10, 20, False, 10)
+        states[15] = True
+        states[10] = True
+        states[25] = False
+        self.assertTrue(states[10])
+        self.assertFalse(states[11])
+        self.assertFalse(states[14])
+        self.assertTrue(states[15])
+        self.assertFalse(states[16])
+        self.assertFalse(states[20])
+        self.assertFalse(states[25])
+        self.assertEqual(states.gaps(1, 30), [(1, 9), (21, 24), (26, 30)])
+        self.assertEqual(states.disabled_by(16), 10)
+        self.assertEqual(states.disabled_by(25), 25)
+
+
+class PyLintASTWalkerTC(TestCase):
+
+    class Checker(object):
+        def __init__(self):
+            self.events = []
+        def visit_function(self, node):
+            self.events.append(('visit', node.name))
+        def leave_function(self, node):
+            self.events.append(('leave', node.name))
+        def visit_name(self, node):
+            self.events.append(('visit', node.name))
+
+    def setUp(self):
+        self.walker = PyLintASTWalker(PyLinter())
+        self.checker = self.Checker()
+        self.walker.add_checker(self.checker)
+
+    def test_events_order(self):
+        module = ASTNGBuilder().string_build(
+            'def first(a=b):\n'
+            '    def second():\n'
+            '        return {c: d} < e\n'
+            'f\n')
+        self.walker.walk(module)
+        self.assertEqual(self.checker.events,
+                         [('visit', 'first'), ('visit', 'b'),
+                          ('visit', 'second'), ('visit', 'c'), ('visit', 'd'),
+                          ('visit', 'e'), ('leave', 'second'),
+                          ('leave', 'first'), ('visit', 'f')])
+        self.assertEqual(self.walker.nbstatements, 5)
+
+    def test_deeply_nested(self):
+        node = nodes.Name()
+        node.name = 'leaf'
+        for _ in xrange(sys.getrecursionlimit() * 2):
+            parent = nodes.List()
+            parent.elts = [node]
+            node = parent
+        self.walker.walk(node)
+        self.assertEqual(self.checker.events, [('visit', 'leaf')])
+
+    def test_expressions_skipped(self):
+        class FunctionChecker(object):
+            def __init__(self):
+                self.events = []
+            def visit_function(self, node):
+                self.events.append(('visit', node.name))
+        module = ASTNGBuilder().string_build('def func():\n    return [a]\n')
+        walker = PyLintASTWalker(PyLinter())
+        checker = FunctionChecker()
+        walker.add_checker(checker)
+        walker.walk(module)
+        self.assertEqual(checker.events, [('visit', 'func')])
+        self.assertEqual(walker.nbstatements, 3)
+        # no expression has callbacks: their children are not walked
+        self.assertIsNone(walker._dispatch[nodes.List][3])
+        self.walker.walk(module)
+        self.assertIsNotNone(self.walker._dispatch[nodes.List][3])
+
+
 class ConfigTC(TestCase):
 
     def setUp(self):
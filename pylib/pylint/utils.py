@@ -19,6 +19,8 @@ main pylint class
 """
 
 import sys
+from bisect import bisect_right
+from timeit import default_timer
 from warnings import warn
 from os.path import dirname, basename, splitext, exists, isdir, join, normpath
 
@@ -29,6 +31,7 @@ from logilab.common.configuration import rest_format_section
 from logilab.common.ureports import Section
 
 from logilab.astng import nodes, Module
+from logilab.astng.bases import NodeNG
 
 from pylint.checkers import EmptyReport
 
@@ -87,6 +90,30 @@ def get_module_and_frameid(node):
     obj.reverse()
     return module, '.'.join(obj)
 
+class NodeLocation(object):
+    """a picklable stand-in for an astng node, holding only what messages need
+    to locate it. Checkers use it to send nodes between processes when
+    running in parallel mode (see PyLinter.check).
+    """
+
+    def __init__(self, node):
+        self.file = node.root().file
+        self.module, self.obj = get_module_and_frameid(node)
+        self.fromlineno = node.fromlineno
+        self.col_offset = getattr(node, 'col_offset', None)
+
+    def _key(self):
+        return (self.file, self.module, self.obj, self.fromlineno, self.col_offset)
+
+    def __eq__(self, other):
+        return isinstance(other, NodeLocation) and self._key() == other._key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._key())
+
 def category_id(id):
     id = id.upper()
     if id in MSG_TYPES:
@@ -94,6 +121,114 @@ def category_id(id):
     return MSG_TYPES_LONG.get(id)
 
 
+class LineStates(object):
+    """the states of a message in the lines of a module, set by block level
+    options: sorted intervals of lines sharing a state and the line of the
+    option which set it
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.states = []
+        self.origins = []
+
+    def _index(self, line):
+        """return the index of the interval containing line, or -1"""
+        i = bisect_right(self.starts, line) - 1
+        if i >= 0 and line <= self.ends[i]:
+            return i
+        return -1
+
+    def __getitem__(self, line):
+        # inlined _index: this is called for every message of the module
+        i = bisect_right(self.starts, line) - 1
+        if i >= 0 and line <= self.ends[i]:
+            return self.states[i]
+        raise KeyError(line)
+
+    def __contains__(self, line):
+        return self._index(line) >= 0
+
+    def get(self, line, default=None):
+        i = self._index(line)
+        if i < 0:
+            return default
+        return self.states[i]
+
+    def disabled_by(self, line):
+        """return the line of the option disabling the message on line"""
+        i = self._index(line)
+        if i < 0 or self.states[i]:
+            raise KeyError(line)
+        return self.origins[i]
+
+    def gaps(self, first, last):
+        """return the intervals of lines between first and last which have no
+        state yet
+        """
+        gaps = []
+        i = bisect_right(self.starts, first) - 1
+        if i >= 0 and self.ends[i] >= first:
+            first = self.ends[i] + 1
+        i += 1
+        while first <= last:
+            if i < len(self.starts) and self.starts[i] <= last:
+                if self.starts[i] > first:
+                    gaps.append((first, self.starts[i] - 1))
+                first = self.ends[i] + 1
+                i += 1
+            else:
+                gaps.append((first, last))
+                break
+        return gaps
+
+    def add(self, first, last, state, origin):
+        """set the state of lines between first and last, which have none"""
+        i = bisect_right(self.starts, first)
+        self.starts.insert(i, first)
+        self.ends.insert(i, last)
+        self.states.insert(i, state)
+        self.origins.insert(i, origin)
+
+    def __setitem__(self, line, state):
+        """set the state of a single line, as an option on this line does once
+        the block level options have been collected (e.g. a checker disabling
+        a message at module scope)
+        """
+        i = self._index(line)
+        if i >= 0:
+            first, last = self.starts[i], self.ends[i]
+            old_state, origin = self.states[i], self.origins[i]
+            for values in (self.starts, self.ends, self.states, self.origins):
+                del values[i]
+            if first < line:
+                self.add(first, line - 1, old_state, origin)
+            if line < last:
+                self.add(line + 1, last, old_state, origin)
+        self.add(line, line, state, line)
+
+
+class SuppressionMapping(object):
+    """map the (msgid, line) of messages disabled by block level options to
+    the line of the option
+    """
+
+    def __init__(self, module_msgs_state):
+        self._module_msgs_state = module_msgs_state
+
+    def __getitem__(self, key):
+        msgid, line = key
+        return self._module_msgs_state[msgid].disabled_by(line)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+
 class Message:
     def __init__(self, checker, msgid, msg, descr, symbol):
         assert len(msgid) == 5, 'Invalid message id %s' % msgid
@@ -118,6 +253,7 @@ class MessagesHandlerMixIn:
         self._msgs_state = {}
         self._module_msgs_state = {} # None
         self._raw_module_msgs_state = {}
+        self._frame_locations = {}
         self._msgs_by_category = {}
         self.msg_status = 0
         self._ignored_msgs = {}
@@ -322,12 +458,18 @@ class MessagesHandlerMixIn:
         """
         if line is None and node is not None:
             line = node.fromlineno
-        if hasattr(node, 'col_offset'):
-            col_offset = node.col_offset # XXX measured in bytes for utf-8, divide by two for chars?
+        # should this message be displayed ? This is is_message_enabled
+        # inlined, since checkers always give numeric ids and most messages
+        # have no block level state in the module
+        line_states = self._module_msgs_state.get(msgid)
+        if line_states is None or line is None:
+            enabled = self._msgs_state.get(msgid, True)
         else:
-            col_offset = None
-        # should this message be displayed
-        if not self.is_message_enabled(msgid, line):
+            try:
+                enabled = line_states[line]
+            except KeyError:
+                enabled = self._msgs_state.get(msgid, True)
+        if not enabled:
             self.handle_ignored_message(
                 self.get_message_state_scope(msgid, line), msgid, line, node, args)
             return
@@ -348,12 +490,29 @@ class MessagesHandlerMixIn:
         if node is None:
             module, obj = self.current_name, ''
             path = self.current_file
+            col_offset = None
+        elif isinstance(node, NodeLocation):
+            module, obj = node.module, node.obj
+            path = node.file
+            col_offset = node.col_offset
         else:
-            module, obj = get_module_and_frameid(node)
-            path = node.root().file
+            path, module, obj = self._frame_location(node.frame())
+            col_offset = getattr(node, 'col_offset', None) # XXX measured in bytes for utf-8, divide by two for chars?
         # add the message
         self.reporter.add_message(msgid, (path, module, obj, line or 1, col_offset or 0), msg)
 
+    def _frame_location(self, frame):
+        """return the file, module name and frame id of the given frame,
+        remembered for the current module since its messages often share
+        frames
+        """
+        try:
+            return self._frame_locations[frame]
+        except KeyError:
+            module, obj = get_module_and_frameid(frame)
+            location = self._frame_locations[frame] = (frame.root().file, module, obj)
+            return location
+
     def help_message(self, msgids):
         """display help messages for the given message identifiers"""
         for msgid in msgids:
@@ -438,6 +597,8 @@ class ReportsHandlerMixIn:
     """
     def __init__(self):
         self._reports = {}
+        # checkers in registration order, for reports in a stable order
+        self._reports_checkers = []
         self._reports_state = {}
 
     def register_report(self, reportid, r_title, r_cb, checker):
@@ -449,6 +610,8 @@ class ReportsHandlerMixIn:
         checker is the checker defining the report
         """
         reportid = reportid.upper()
+        if checker not in self._reports:
+            self._reports_checkers.append(checker)
         self._reports.setdefault(checker, []).append( (reportid, r_title, r_cb) )
 
     def enable_report(self, reportid):
@@ -471,7 +634,7 @@ class ReportsHandlerMixIn:
         """render registered reports"""
         sect = Section('Report',
                        '%s statements analysed.'% (self.stats['statement']))
-        for checker in self._reports:
+        for checker in self._reports_checkers:
             for reportid, r_title, r_cb in self._reports[checker]:
                 if not self.report_is_enabled(reportid):
                     continue
@@ -540,14 +703,62 @@ def expand_modules(files_or_modules, black_list):
     return result, errors
 
 
+class CheckersProfiler(object):
+    """time the methods of checkers, for the checkers profile report (see the
+    profile-checkers option)
+    """
+
+    def __init__(self):
+        self.modules = 0
+        # [calls, time] per checker name and method name
+        self._timings = {}
+
+    def timed(self, checker, method):
+        """return a function calling the given bound method of the checker and
+        timing it
+        """
+        timing = self._timings.setdefault((checker.name, method.__name__),
+                                          [0, 0.])
+        def timed_method(*args):
+            start = default_timer()
+            try:
+                return method(*args)
+            finally:
+                timing[0] += 1
+                timing[1] += default_timer() - start
+        return timed_method
+
+    def flush(self, stats):
+        """add the timings since the last flush to the statistics"""
+        profile = stats.setdefault('checkers_profile',
+                                   {'modules': 0, 'methods': {}})
+        profile['modules'] += self.modules
+        self.modules = 0
+        methods = profile['methods']
+        for key, timing in self._timings.iteritems():
+            if not timing[0]:
+                continue
+            try:
+                methods[key]['calls'] += timing[0]
+                methods[key]['time'] += timing[1]
+            except KeyError:
+                methods[key] = {'calls': timing[0], 'time': timing[1]}
+            # timed methods keep a reference on their timing
+            timing[0], timing[1] = 0, 0.
+
+
 class PyLintASTWalker(object):
 
-    def __init__(self, linter):
+    def __init__(self, linter, profiler=None):
         # callbacks per node types
         self.nbstatements = 1
         self.visit_events = {}
         self.leave_events = {}
         self.linter = linter
+        # CheckersProfiler timing the callbacks, if any
+        self.profiler = profiler
+        # dispatch entries per node class, compiled from the callbacks
+        self._dispatch = None
 
     def add_checker(self, checker):
         """walk to the checker's dir and collect visit and leave methods"""
@@ -557,6 +768,7 @@ class PyLintASTWalker(object):
         visits = self.visit_events
         leaves = self.leave_events
         msgs = self.linter._msgs_state
+        profiler = self.profiler
         for member in dir(checker):
             cid = member[6:]
             if cid == 'default':
@@ -567,6 +779,8 @@ class PyLintASTWalker(object):
                 if hasattr(v_meth, 'checks_msgs'):
                     if not any(msgs.get(m, True) for m in v_meth.checks_msgs):
                         continue
+                if profiler is not None:
+                    v_meth = profiler.timed(checker, v_meth)
                 visits.setdefault(cid, []).append(v_meth)
                 vcids.add(cid)
             elif member.startswith('leave_'):
@@ -575,28 +789,119 @@ class PyLintASTWalker(object):
                 if hasattr(l_meth, 'checks_msgs'):
                     if not any(msgs.get(m, True) for m in l_meth.checks_msgs):
                         continue
+                if profiler is not None:
+                    l_meth = profiler.timed(checker, l_meth)
                 leaves.setdefault(cid, []).append(l_meth)
                 lcids.add(cid)
         visit_default = getattr(checker, 'visit_default', None)
         if visit_default:
+            if profiler is not None:
+                visit_default = profiler.timed(checker, visit_default)
             for cls in nodes.ALL_NODE_CLASSES:
                 cid = cls.__name__.lower()
                 if cid not in vcids:
                     visits.setdefault(cid, []).append(visit_default)
         # for now we have no "leave_default" method in Pylint
+        self._dispatch = None
+
+    def _compile(self):
+        """compile the dispatch table from the callbacks of the checkers"""
+        self._dispatch = {}
+        # expressions can't contain statements, so they have nothing to walk
+        # when no expression has callbacks
+        self._walk_expressions = any(
+            self._has_callbacks(cls) for cls in nodes.ALL_NODE_CLASSES
+            if _is_expression_class(cls))
+        for cls in nodes.ALL_NODE_CLASSES:
+            self._compile_class(cls)
+
+    def _has_callbacks(self, cls):
+        cid = cls.__name__.lower()
+        return bool(self.visit_events.get(cid) or self.leave_events.get(cid))
+
+    def _compile_class(self, cls):
+        """return the dispatch entry of a node class: its visit and leave
+        callbacks, whether it's a statement and how to get its children (None
+        when they don't have to be walked)
+        """
+        cid = cls.__name__.lower()
+        if _is_expression_class(cls) and not self._walk_expressions:
+            children = None
+        else:
+            children = _children_getter(cls)
+        entry = (tuple(self.visit_events.get(cid, ())),
+                 tuple(self.leave_events.get(cid, ())),
+                 cls.is_statement, children)
+        self._dispatch[cls] = entry
+        return entry
 
     def walk(self, astng):
-        """call visit events of astng checkers for the given node, recurse on
-        its children, then leave events.
+        """call visit events of astng checkers for the given node, walk its
+        children, then leave events.
+
+        Nodes are walked depth first, in the same order as they would be
+        recursively, with a stack so that deeply nested code can't reach the
+        recursion limit.
         """
-        cid = astng.__class__.__name__.lower()
-        if astng.is_statement:
-            self.nbstatements += 1
-        # generate events for this node on each checker
-        for cb in self.visit_events.get(cid, ()):
-            cb(astng)
-        # recurse on children
-        for child in astng.get_children():
-            self.walk(child)
-        for cb in self.leave_events.get(cid, ()):
-            cb(astng)
+        if self._dispatch is None:
+            self._compile()
+        dispatch = self._dispatch
+        nbstatements = 0
+        # (node, None) to visit a node, (node, callbacks) to leave it
+        stack = [(astng, None)]
+        pop = stack.pop
+        push = stack.append
+        try:
+            while stack:
+                node, leaves = pop()
+                if leaves is not None:
+                    for cb in leaves:
+                        cb(node)
+                    continue
+                try:
+                    visits, leaves, is_statement, children = dispatch[node.__class__]
+                except KeyError:
+                    visits, leaves, is_statement, children = \
+                        self._compile_class(node.__class__)
+                if is_statement:
+                    nbstatements += 1
+                # generate events for this node on each checker
+                for cb in visits:
+                    cb(node)
+                if leaves:
+                    push((node, leaves))
+                if children is not None:
+                    for child in reversed(children(node)):
+                        push((child, None))
+        finally:
+            self.nbstatements += nbstatements
+
+
+def _is_expression_class(cls):
+    """tell whether nodes of the given class can't contain statements"""
+    return not cls.is_statement and not issubclass(cls, Module)
+
+def _children_getter(cls):
+    """return a function giving the list of children of nodes of the given
+    class, without the generator and its lookups of NodeNG.get_children
+    """
+    if getattr(cls.get_children, 'im_func', None) is not _GET_CHILDREN:
+        # Dict, Compare... override it
+        return lambda node: list(node.get_children())
+    fields = cls._astng_fields
+    if not fields:
+        return None
+    def get_children(node):
+        children = []
+        for field in fields:
+            attr = getattr(node, field)
+            if attr is None:
+                continue
+            if isinstance(attr, (list, tuple)):
+                children.extend(attr)
+            else:
+                children.append(attr)
+        return children
+    return get_children
+
+_GET_CHILDREN = NodeNG.get_children.im_func